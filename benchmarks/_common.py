@@ -0,0 +1,34 @@
+"""Shared helpers for the benchmark scripts."""
+
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(ide: str, task: str) -> ModuleType:
+    """
+    Load ``ides/<ide>/<task>.py`` as a uniquely named module.
+
+    The IDE directories contain dashes and are not packages, so they cannot
+    be imported the usual way.
+
+    Args:
+        ide: IDE directory name, e.g. ``github-copilot``
+        task: Task module name without the ``.py`` suffix, e.g. ``task1``
+
+    Returns:
+        ModuleType: The loaded module
+    """
+    name = f"{ide.replace('-', '_')}_{task}"
+    if name in sys.modules:
+        return sys.modules[name]
+
+    path = os.path.join(ROOT, 'ides', ide, f'{task}.py')
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
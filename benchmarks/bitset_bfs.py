@@ -0,0 +1,57 @@
+"""
+Benchmark the bit-parallel BFS against the deque BFS in
+``ides/github-copilot/task1.py`` on random mazes.
+
+Usage:
+    python benchmarks/bitset_bfs.py [--sizes 100 300 1000] [--densities 0.0 0.2 0.3]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from _common import load_module
+
+
+def random_maze(size: int, density: float, rng: random.Random) -> List[List[int]]:
+    """Generate a square maze with the given wall density and open corners."""
+    maze = [[1 if rng.random() < density else 0 for _ in range(size)] for _ in range(size)]
+    maze[0][0] = maze[-1][-1] = 0
+    return maze
+
+
+def best_of(solver, maze, repeat: int):
+    """Return the solver result and its best wall-clock time over ``repeat`` runs."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = solver(maze)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--densities', type=float, nargs='+', default=[0.0, 0.2, 0.3])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    task1 = load_module('github-copilot', 'task1')
+    rng = random.Random(args.seed)
+
+    print(f"{'size':>6} {'density':>8} {'path':>8} {'deque (s)':>10} {'bitset (s)':>11} {'speedup':>8}")
+    for size in args.sizes:
+        for density in args.densities:
+            maze = random_maze(size, density, rng)
+            expected, deque_time = best_of(task1.find_shortest_path, maze, args.repeat)
+            result, bitset_time = best_of(task1.find_shortest_path_bitset, maze, args.repeat)
+            assert result == expected, f"bitset={result} deque={expected} (size={size}, density={density})"
+            print(f"{size:>6} {density:>8.2f} {expected:>8} {deque_time:>10.4f} "
+                  f"{bitset_time:>11.4f} {deque_time / bitset_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Re-download a URL set with the conditional-request cache of the windsurf
+``Downloader`` and report how many responses were full bodies versus
+304 Not Modified, against a local aiohttp server with ETag support.
+
+Usage:
+    python benchmarks/conditional_cache.py [--files 200] [--size-kb 256] [--runs 3]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from _common import load_module
+
+
+def make_app(root: str, statuses: Counter) -> web.Application:
+    async def count(request: web.Request, response: web.StreamResponse) -> None:
+        statuses[response.status] += 1
+
+    async def serve(request: web.Request) -> web.FileResponse:
+        # FileResponse answers If-None-Match/If-Modified-Since by itself
+        return web.FileResponse(os.path.join(root, request.match_info['name']))
+
+    app = web.Application()
+    app.on_response_prepare.append(count)
+    app.router.add_get('/{name}', serve)
+    return app
+
+
+async def run(task3, directory: str, files: int, size_kb: int, runs: int) -> None:
+    root = os.path.join(directory, 'site')
+    out = os.path.join(directory, 'out')
+    os.makedirs(root)
+    os.makedirs(out)
+    for n in range(files):
+        with open(os.path.join(root, f'{n}.bin'), 'wb') as f:
+            f.write(os.urandom(size_kb * 1024))
+
+    statuses: Counter = Counter()
+    runner = web.AppRunner(make_app(root, statuses), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def crawl() -> None:
+        async with task3.Downloader(cache_path=os.path.join(directory, 'cache.db')) as downloader:
+            results = {'success': 0, 'failed': 0}
+            for saved in await asyncio.gather(*(
+                    downloader.download(f"{base}/{n}.bin", os.path.join(out, f'{n}.bin'))
+                    for n in range(files))):
+                results['success' if saved else 'failed'] += 1
+            assert results == {'success': files, 'failed': 0}, results
+
+    print(f"{files} files of {size_kb} KiB")
+    try:
+        for attempt in range(1, runs + 1):
+            if attempt == runs:
+                # Change one file on the server and delete one local copy
+                with open(os.path.join(root, '0.bin'), 'ab') as f:
+                    f.write(b'changed')
+                os.remove(os.path.join(out, '1.bin'))
+            statuses.clear()
+            start = time.perf_counter()
+            await crawl()
+            elapsed = time.perf_counter() - start
+            print(f"run {attempt}: {statuses[200]:>5} full  {statuses[304]:>5} not modified  {elapsed:6.2f}s")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--size-kb', type=int, default=256)
+    parser.add_argument('--runs', type=int, default=3, help='the last run changes one file first')
+    args = parser.parse_args()
+
+    # Importing the downloader creates its error log in the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        task3.logger.setLevel('WARNING')
+        asyncio.run(run(task3, directory, args.files, args.size_kb, args.runs))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Requests per second of the windsurf ``Downloader`` (one pooled session)
+against a new ClientSession per request, on a local aiohttp test server.
+
+Usage:
+    python benchmarks/connection_reuse.py [--requests 2000] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+from _common import load_module
+
+
+async def hello(request: web.Request) -> web.Response:
+    return web.Response(text='hello')
+
+
+async def bounded(concurrency: int, requests: int, fetch) -> float:
+    """Run ``requests`` fetches, ``concurrency`` at a time; returns requests/sec."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            _, _, ok = await fetch()
+            assert ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def run(task3, requests: int, concurrency: int) -> None:
+    app = web.Application()
+    app.router.add_get('/', hello)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/"
+
+    async def fresh_session():
+        async with aiohttp.ClientSession() as session:
+            return await task3.download_url(session, url)
+
+    try:
+        rate = await bounded(concurrency, requests, fresh_session)
+        print(f"{'session per request':>20}: {rate:8,.0f} req/s")
+        async with task3.Downloader(limit_per_host=concurrency) as downloader:
+            rate = await bounded(concurrency, requests, lambda: downloader.fetch(url))
+        print(f"{'pooled Downloader':>20}: {rate:8,.0f} req/s")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    args = parser.parse_args()
+
+    # Importing the downloader creates its error log in the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        print(f"{args.requests:,} requests, {args.concurrency} concurrent")
+        asyncio.run(run(task3, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Download the same bodies from several mirrors with the windsurf
+``download_pipeline``, once into the flat ``<host>.html`` layout and once
+into a ``ContentStore``, and compare what ends up on disk, against a local
+aiohttp server.
+
+Usage:
+    python benchmarks/content_store.py [--bodies 200] [--mirrors 5] [--size-kb 64]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from aiohttp import web
+
+from _common import load_module
+
+
+def disk_usage(root: str) -> tuple:
+    """(files, bytes, largest directory) below ``root``."""
+    files = size = widest = 0
+    for directory, dirnames, filenames in os.walk(root):
+        widest = max(widest, len(dirnames) + len(filenames))
+        for name in filenames:
+            files += 1
+            size += os.path.getsize(os.path.join(directory, name))
+    return files, size, widest
+
+
+async def run(task3, directory: str, args) -> None:
+    bodies = [os.urandom(args.size_kb * 1024) for _ in range(args.bodies)]
+
+    async def serve(request: web.Request) -> web.Response:
+        return web.Response(body=bodies[int(request.match_info['n'])])
+
+    app = web.Application()
+    app.router.add_get('/{mirror}/{n}', serve)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    urls = [f"{base}/{mirror}/{n}" for mirror in range(args.mirrors) for n in range(args.bodies)]
+    transferred = len(urls) * args.size_kb * 1024
+
+    try:
+        flat = os.path.join(directory, 'flat')
+        os.makedirs(flat)
+        os.chdir(flat)
+        results = await task3.download_pipeline(urls)
+        files, size, widest = disk_usage(flat)
+        print(f"{'flat':>6}: {results['success']:>6,} saved  {files:>6,} files  {size / 2 ** 20:8.1f} MiB  "
+              f"widest dir {widest:>6,}  (of {transferred / 2 ** 20:.1f} MiB transferred)")
+
+        root = os.path.join(directory, 'store')
+        async with task3.Downloader(store_path=root) as downloader:
+            results = await downloader.run(urls)
+            deduplicated = downloader.store.deduplicated
+            for n, url in enumerate(urls):
+                with open(downloader.store.lookup(url), 'rb') as f:
+                    assert f.read() == bodies[n % args.bodies], url
+        files, size, widest = disk_usage(os.path.join(root, 'objects'))
+        print(f"{'store':>6}: {results['success']:>6,} saved  {files:>6,} files  {size / 2 ** 20:8.1f} MiB  "
+              f"widest dir {widest:>6,}  ({deduplicated:,} duplicates)")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bodies', type=int, default=200, help='distinct bodies')
+    parser.add_argument('--mirrors', type=int, default=5, help='URLs serving each body')
+    parser.add_argument('--size-kb', type=int, default=64)
+    args = parser.parse_args()
+
+    # The downloader writes its files (and error log) to the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        task3.logger.setLevel('WARNING')
+        asyncio.run(run(task3, directory, args))
+
+
+if __name__ == '__main__':
+    main()
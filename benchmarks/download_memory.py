@@ -0,0 +1,77 @@
+"""
+Compare peak memory of ``download_files`` in ``ides/windsurf/task3.py`` with
+bodies buffered in memory versus streamed to disk, against a local aiohttp
+server serving large bodies.
+
+Usage:
+    python benchmarks/download_memory.py [--files 8] [--size-mb 16]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web
+
+from _common import load_module
+
+BLOCK = os.urandom(1 << 20)
+
+
+async def serve_body(request: web.Request) -> web.StreamResponse:
+    """Stream ``size_mb`` MiB of data without holding it all in the server."""
+    response = web.StreamResponse()
+    response.content_length = request.app['size_mb'] * len(BLOCK)
+    await response.prepare(request)
+    for _ in range(request.app['size_mb']):
+        await response.write(BLOCK)
+    return response
+
+
+async def run(task3, files: int, size_mb: int) -> None:
+    app = web.Application()
+    app['size_mb'] = size_mb
+    app.router.add_get('/file/{n}', serve_body)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    urls = [f'http://127.0.0.1:{port}/file/{n}' for n in range(files)]
+
+    print(f"{files} files of {size_mb} MiB")
+    try:
+        for stream in (False, True):
+            tracemalloc.start()
+            start = time.perf_counter()
+            results = await task3.download_files(urls, stream=stream)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            assert results == {'success': files, 'failed': 0}, results
+            assert os.path.getsize('127.0.0.1.html') == size_mb * len(BLOCK)
+            print(f"{'streaming' if stream else 'buffered':>10}: peak {peak / 2 ** 20:8.1f} MiB  "
+                  f"{elapsed:6.2f}s")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--size-mb', type=int, default=16)
+    args = parser.parse_args()
+
+    # The downloader writes its files (and error log) to the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        task3.logger.setLevel('WARNING')
+        asyncio.run(run(task3, args.files, args.size_mb))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare end-to-end throughput (enqueue to execution) of the SQLite-backed
+DurableTaskManager against the in-memory TaskManager and CompactTaskManager
+in ``ides/windsurf/task2.py``, all running the same no-op tasks, and check
+that expired leases are recovered.
+
+Usage:
+    python benchmarks/durable_queue.py [--tasks 200000] [--batch-size 500] [--workers 8]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from _common import load_module
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    task2 = load_module('windsurf', 'task2')
+    logging.getLogger().setLevel(logging.WARNING)
+    n, batch, workers = args.tasks, args.batch_size, args.workers
+
+    class NoOp(task2.Task):
+        async def execute(self) -> bool:
+            return True
+
+    def factory(task_id: int, priority: int, payload) -> task2.Task:
+        return NoOp(task_id, priority)
+
+    async def in_memory() -> None:
+        manager = task2.TaskManager(workers)
+        for i in range(n):
+            manager.add_task(NoOp(i, i % 10))
+        log = await manager.execute_tasks()
+        assert len(log) == n
+
+    async def compact() -> None:
+        manager = task2.CompactTaskManager(workers, task_factory=factory)
+        for i in range(n):
+            manager.add(i, i % 10)
+        counts = await manager.execute_tasks()
+        assert counts[task2.TaskStatus.DONE] == n
+
+    with tempfile.TemporaryDirectory() as directory:
+        async def durable() -> None:
+            manager = task2.DurableTaskManager(os.path.join(directory, 'bench.db'), workers,
+                                               batch_size=batch, task_factory=factory)
+            for i in range(n):
+                manager.add(i, i % 10)
+            counts = await manager.execute_tasks()
+            assert counts[task2.TaskStatus.DONE] == n
+            assert manager.store.counts()['finished'] == n
+            manager.store.close()
+
+        timings = {}
+        for name, run in (('TaskManager', in_memory), ('Compact', compact), ('Durable', durable)):
+            start = time.perf_counter()
+            asyncio.run(run())
+            timings[name] = time.perf_counter() - start
+
+        # A claimed batch that is never acknowledged comes back after its lease
+        store = task2.SQLiteTaskQueue(os.path.join(directory, 'lease.db'), lease_seconds=0.1)
+        store.enqueue_many((i, 0, None) for i in range(10))
+        first = store.claim(10)
+        assert store.claim(10) == []
+        time.sleep(0.2)
+        assert [row[0] for row in store.claim(10)] == [row[0] for row in first]
+        store.close()
+
+    print(f"{n:,} no-op tasks, {workers} workers, batches of {batch}")
+    baseline = timings['TaskManager']
+    for name, seconds in timings.items():
+        print(f"{name:>12}: {n / seconds:10,.0f} tasks/s  ({seconds / baseline:.2f}x the TaskManager time)")
+    print("lease recovery: ok")
+
+
+if __name__ == '__main__':
+    main()
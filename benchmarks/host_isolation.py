@@ -0,0 +1,142 @@
+"""
+Show how one bad host drags down ``Downloader.run`` in
+``ides/windsurf/task3.py``, with and without per-host circuit breakers and
+AIMD concurrency limits (``adaptive``).
+
+Three local hosts (ports) get the same number of URLs, interleaved:
+
+- ``healthy``: answers at once
+- ``slow``: answers after ``--delay`` seconds per request it is already
+  serving, like a server that is overloaded by concurrency
+- ``dead``: accepts connections and never answers, so every request runs
+  into the (shortened) timeout
+
+Both ``Downloader.run`` (fixed workers) and ``download_files`` (every URL
+at once) are measured. For each mode the harness reports when the last URL of every host was
+done, how many succeeded, and the final per-host limit and circuit state.
+
+Usage:
+    python benchmarks/host_isolation.py [--urls 200] [--workers 32] [--timeout 0.5]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+from aiohttp import web
+
+from _common import load_module
+
+
+async def healthy(request: web.Request) -> web.Response:
+    return web.Response(text='hello')
+
+
+def make_slow(delay: float):
+    serving = 0
+
+    async def slow(request: web.Request) -> web.Response:
+        nonlocal serving
+        serving += 1
+        try:
+            await asyncio.sleep(delay * serving)
+            return web.Response(text='hello')
+        finally:
+            serving -= 1
+
+    return slow
+
+
+async def start_app(handler) -> tuple:
+    app = web.Application()
+    app.router.add_get('/{n}', handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+async def start_blackhole() -> tuple:
+    """Server that accepts connections and never answers."""
+    connections = []
+
+    async def swallow(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connections.append(writer)
+        await reader.read()
+
+    server = await asyncio.start_server(swallow, '127.0.0.1', 0)
+    return server, connections, server.sockets[0].getsockname()[1]
+
+
+async def run(task3, args) -> None:
+    healthy_runner, healthy_port = await start_app(healthy)
+    slow_runner, slow_port = await start_app(make_slow(args.delay))
+    blackhole, connections, dead_port = await start_blackhole()
+    ports = {'healthy': healthy_port, 'slow': slow_port, 'dead': dead_port}
+    names = {f"127.0.0.1:{port}": name for name, port in ports.items()}
+
+    class Timed(task3.Downloader):
+        """Downloader recording when each host's URLs finish."""
+
+        async def process(self, url: str, stream: bool = False) -> bool:
+            saved = await super().process(url, stream)
+            name = names[task3.host_of(url)]
+            self.finished[name] = time.perf_counter() - self.started
+            self.saved[name] += saved
+            return saved
+
+    try:
+        for entry, adaptive in (('run', False), ('run', True), ('download_files', False), ('download_files', True)):
+            urls = [f"http://127.0.0.1:{ports[name]}/{n}"
+                    for n in range(args.urls) for name in ('healthy', 'slow', 'dead')]
+            downloader = Timed(adaptive=adaptive, cooldown=args.cooldown)
+            downloader.finished, downloader.saved = {}, defaultdict(int)
+            async with downloader:
+                downloader.started = time.perf_counter()
+                if entry == 'run':
+                    await downloader.run(urls, workers=args.workers)
+                else:
+                    await downloader.download_files(urls, stream=True)
+            print(f"{entry}, adaptive={adaptive}:")
+            for name in ('healthy', 'slow', 'dead'):
+                state = downloader.hosts.get(f"127.0.0.1:{ports[name]}")
+                detail = f"limit {state.limit:4.1f}  circuit {state.state}" if state else ''
+                print(f"  {name:>8}: done after {downloader.finished[name]:6.2f}s  "
+                      f"{downloader.saved[name]:>5}/{args.urls} saved  {detail}")
+            if adaptive:
+                print(f"  failed fast: {downloader.short_circuited}")
+            for writer in connections:
+                writer.close()
+            connections.clear()
+    finally:
+        blackhole.close()
+        await healthy_runner.cleanup()
+        await slow_runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--urls', type=int, default=200, help='URLs per host')
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--timeout', type=float, default=0.5, help='request timeout in seconds')
+    parser.add_argument('--delay', type=float, default=0.01,
+                        help='seconds the slow host adds per request it is already serving')
+    parser.add_argument('--cooldown', type=float, default=5.0, help='seconds an open circuit waits')
+    args = parser.parse_args()
+
+    # The downloader writes its files (and error log) to the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        task3.logger.setLevel('CRITICAL')
+        task3.TIMEOUT = args.timeout
+        task3.BACKOFF = args.timeout / 10
+        asyncio.run(run(task3, args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure event-loop latency while logging task completions at a fixed rate,
+with a FileHandler called directly on the loop versus the queue-based
+pipeline (``start_log_pipeline``) in ``ides/windsurf/task2.py``.
+
+A producer coroutine logs ``--rate`` records per second in 1 ms ticks while a
+probe coroutine measures how late its own 1 ms sleeps wake up. ``--fsync``
+makes the file handler sync every flush to disk, as a stand-in for a slow or
+busy disk.
+
+Usage:
+    python benchmarks/log_pipeline.py [--rate 10000] [--seconds 2] [--fsync]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from _common import load_module
+
+task2 = load_module('windsurf', 'task2')
+
+
+class SyncedFileHandler(logging.FileHandler):
+    """FileHandler that fsyncs on every flush."""
+
+    def flush(self) -> None:
+        super().flush()
+        if self.stream is not None:
+            os.fsync(self.stream.fileno())
+
+
+async def load(bench: logging.Logger, rate: int, seconds: float) -> dict:
+    """Log at ``rate`` records/s and return loop lag statistics in ms."""
+    lags = []
+    start = time.perf_counter()
+    stop = start + seconds
+
+    async def produce() -> None:
+        task_id = 0
+        while time.perf_counter() < stop:
+            # Catch up with the target rate after a late wake-up
+            due = int((time.perf_counter() - start) * rate)
+            while task_id < due:
+                bench.info("Task %s done", task_id)
+                task_id += 1
+            await asyncio.sleep(0.001)
+
+    async def probe() -> None:
+        while time.perf_counter() < stop:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - before - 0.001) * 1000)
+
+    await asyncio.gather(produce(), probe())
+    lags.sort()
+    return {
+        'p50': lags[len(lags) // 2],
+        'p99': lags[int(len(lags) * 0.99)],
+        'max': lags[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate', type=int, default=10_000, help='log records per second')
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--fsync', action='store_true', help='fsync the log file on every flush')
+    args = parser.parse_args()
+
+    handler_class = SyncedFileHandler if args.fsync else logging.FileHandler
+    print(f"{args.rate:,} records/s for {args.seconds}s{' with fsync' if args.fsync else ''}; "
+          f"loop lag in ms")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('direct', 'pipeline'):
+            bench = logging.getLogger(f'bench.{mode}')
+            bench.propagate = False
+            bench.setLevel(logging.INFO)
+            path = os.path.join(directory, f'{mode}.log')
+            bench.addHandler(handler_class(path))
+            listener = task2.start_log_pipeline(bench) if mode == 'pipeline' else None
+
+            lag = asyncio.run(load(bench, args.rate, args.seconds))
+            if listener is not None:
+                listener.stop()
+            with open(path, encoding='utf-8') as f:
+                lines = sum(1 for _ in f)
+            print(f"{mode:>9}: p50 {lag['p50']:6.2f}  p99 {lag['p99']:6.2f}  max {lag['max']:7.2f}  "
+                  f"({lines:,} lines written)")
+
+
+if __name__ == '__main__':
+    main()
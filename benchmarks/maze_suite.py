@@ -0,0 +1,301 @@
+"""
+Maze-solver benchmark suite across every ``ides/*/task1.py`` implementation.
+
+Mazes are generated by size, wall density and topology:
+
+- ``open``: no walls
+- ``random``: independent walls with the given density
+- ``spiral``: L-shaped corridors wound around the target corner
+- ``dfs``: perfect maze carved by an iterative depth-first search
+- ``unreachable``: open maze cut in two by a full wall
+
+Each solver is timed (best of ``--repeat``), measured for peak memory with
+tracemalloc in a separate run, and checked against a reference BFS that counts
+steps (edges). Results are written as JSON; ``--baseline`` compares against a
+previous run and exits non-zero on throughput or correctness regressions.
+
+Usage:
+    python benchmarks/maze_suite.py [--max-cells 1e6] [--output results.json]
+    python benchmarks/maze_suite.py --baseline results.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from _common import ROOT, load_module
+
+Maze = List[List[int]]
+
+TOPOLOGIES = ('open', 'random', 'spiral', 'dfs', 'unreachable')
+
+
+def generate_open(rows: int, cols: int, rng: random.Random) -> Maze:
+    """Maze without walls."""
+    return [[0] * cols for _ in range(rows)]
+
+
+def generate_random(rows: int, cols: int, rng: random.Random, density: float) -> Maze:
+    """Independent walls with probability ``density``; corners kept open."""
+    maze = [[1 if rng.random() < density else 0 for _ in range(cols)] for _ in range(rows)]
+    maze[0][0] = maze[-1][-1] = 0
+    return maze
+
+
+def generate_spiral(rows: int, cols: int, rng: random.Random) -> Maze:
+    """
+    Nested L-shaped walls around the bottom-right corner.
+
+    Cells at odd Chebyshev distance from the target are walls, with a single
+    gap alternating between the right and bottom borders, so the only path
+    winds back and forth through every corridor.
+    """
+    maze = generate_open(rows, cols, rng)
+    outer = max(rows, cols) - 1
+    for distance in range(1, outer, 2):
+        row, col = rows - 1 - distance, cols - 1 - distance
+        if row >= 0:
+            maze[row][max(col, 0):] = [1] * (cols - max(col, 0))
+        if col >= 0:
+            for r in range(max(row, 0), rows):
+                maze[r][col] = 1
+        # Alternate the gap between the right and the bottom end of the L
+        if (distance // 2) % 2 == 0:
+            if row >= 0:
+                maze[row][cols - 1] = 0
+            else:
+                maze[0][col] = 0
+        else:
+            if col >= 0:
+                maze[rows - 1][col] = 0
+            else:
+                maze[row][cols - 1] = 0
+    maze[0][0] = 0
+    return maze
+
+
+def generate_dfs(rows: int, cols: int, rng: random.Random) -> Maze:
+    """Perfect maze carved on even coordinates by an iterative DFS."""
+    maze = [[1] * cols for _ in range(rows)]
+    maze[0][0] = 0
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc, dr // 2, dc // 2)
+                   for dr, dc in ((0, 2), (2, 0), (0, -2), (-2, 0))
+                   if 0 <= row + dr < rows and 0 <= col + dc < cols and maze[row + dr][col + dc] == 1]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc, hr, hc = rng.choice(options)
+        maze[row + hr][col + hc] = 0
+        maze[nr][nc] = 0
+        stack.append((nr, nc))
+
+    # With an even side the target is off the carving grid; connect it to the nearest node
+    last_row, last_col = (rows - 1) // 2 * 2, (cols - 1) // 2 * 2
+    for c in range(last_col, cols):
+        maze[last_row][c] = 0
+    for r in range(last_row, rows):
+        maze[r][cols - 1] = 0
+    return maze
+
+
+def generate_unreachable(rows: int, cols: int, rng: random.Random) -> Maze:
+    """Open maze split by a full wall row (or column for single-row mazes)."""
+    maze = generate_open(rows, cols, rng)
+    if rows > 2:
+        maze[rows // 2] = [1] * cols
+    elif cols > 2:
+        for row in maze:
+            row[cols // 2] = 1
+    else:
+        maze[-1][-1] = 1
+    return maze
+
+
+def generate(topology: str, rows: int, cols: int, density: float, seed: int) -> Maze:
+    """Generate a maze of the given topology; ``density`` only applies to ``random``."""
+    rng = random.Random(seed)
+    if topology == 'random':
+        return generate_random(rows, cols, rng, density)
+    return {
+        'open': generate_open,
+        'spiral': generate_spiral,
+        'dfs': generate_dfs,
+        'unreachable': generate_unreachable,
+    }[topology](rows, cols, rng)
+
+
+def reference_distance(maze: Maze) -> int:
+    """Reference BFS on a flat bytearray; returns the number of steps or -1."""
+    rows, cols = len(maze), len(maze[0])
+    if maze[0][0] != 0 or maze[-1][-1] != 0:
+        return -1
+    blocked = bytearray(1 if cell != 0 else 0 for row in maze for cell in row)
+    dist = [-1] * (rows * cols)
+    dist[0] = 0
+    blocked[0] = 1
+    queue = deque([0])
+    target = rows * cols - 1
+    while queue:
+        index = queue.popleft()
+        if index == target:
+            return dist[index]
+        col = index % cols
+        for neighbour, ok in ((index + 1, col + 1 < cols), (index - 1, col > 0),
+                              (index + cols, index + cols < rows * cols), (index - cols, index >= cols)):
+            if ok and not blocked[neighbour]:
+                blocked[neighbour] = 1
+                dist[neighbour] = dist[index] + 1
+                queue.append(neighbour)
+    return -1
+
+
+def discover_solvers(names: Optional[List[str]] = None) -> Dict[str, Callable[[Maze], int]]:
+    """
+    Find the solver in every ``ides/*/task1.py``.
+
+    Extra modes exposed through a module-level ``SOLVERS`` dict are included
+    as ``<ide>:<mode>``; modes in ``EXTRA_SOLVERS`` only when named in
+    ``names``.
+    """
+    solvers: Dict[str, Callable[[Maze], int]] = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, 'ides', '*', 'task1.py'))):
+        ide = os.path.basename(os.path.dirname(path))
+        module = load_module(ide, 'task1')
+        solver = getattr(module, 'find_shortest_path', None) or getattr(module, 'shortest_path', None)
+        if solver is None:
+            continue
+        solvers[ide] = solver
+        for mode, extra in getattr(module, 'SOLVERS', {}).items():
+            if extra is not solver:
+                solvers[f'{ide}:{mode}'] = extra
+        for mode, extra in getattr(module, 'EXTRA_SOLVERS', {}).items():
+            if names and f'{ide}:{mode}' in names:
+                solvers[f'{ide}:{mode}'] = extra
+    if names:
+        solvers = {name: solver for name, solver in solvers.items() if name in names}
+    return solvers
+
+
+def workloads(args) -> Iterator[Tuple[str, float, int, int]]:
+    """Yield ``(topology, density, rows, cols)`` combinations to benchmark."""
+    exponent = 2
+    while 10 ** exponent <= args.max_cells:
+        side = round(10 ** (exponent / 2))
+        for topology in args.topologies:
+            densities = args.densities if topology == 'random' else [0.0]
+            for density in densities:
+                yield topology, density, side, side
+        exponent += 1
+
+
+def measure(solver: Callable[[Maze], int], maze: Maze, repeat: int, memory: bool) -> Dict:
+    """Time ``solver`` on ``maze`` and optionally record its peak traced memory."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = solver(maze)
+        best = min(best, time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        solver(maze)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {'result': result, 'seconds': best, 'peak_bytes': peak}
+
+
+def compare(records: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Return human-readable regressions of ``records`` against ``baseline``."""
+    key = lambda r: (r['solver'], r['topology'], r['density'], r['cells'])  # noqa: E731
+    previous = {key(r): r for r in baseline}
+    problems = []
+    for record in records:
+        old = previous.get(key(record))
+        if old is None:
+            continue
+        label = '{solver} {topology} d={density} cells={cells}'.format(**record)
+        if old['correct'] and not record['correct']:
+            problems.append(f"{label}: now incorrect ({record['result']} != {record['expected']})")
+        if record['cells_per_sec'] < old['cells_per_sec'] * (1 - tolerance):
+            problems.append(f"{label}: {old['cells_per_sec']:.0f} -> {record['cells_per_sec']:.0f} cells/sec")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-cells', type=float, default=1e6,
+                        help='largest maze size in cells, stepping by 10x from 1e2 (up to 1e8)')
+    parser.add_argument('--topologies', nargs='+', choices=TOPOLOGIES, default=list(TOPOLOGIES))
+    parser.add_argument('--densities', type=float, nargs='+', default=[0.1, 0.3])
+    parser.add_argument('--solvers', nargs='+', help='subset of solvers, e.g. windsurf github-copilot:bitset')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory run')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    parser.add_argument('--baseline', help='previous JSON results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative throughput drop against the baseline')
+    args = parser.parse_args()
+
+    solvers = discover_solvers(args.solvers)
+    records = []
+    for topology, density, rows, cols in workloads(args):
+        maze = generate(topology, rows, cols, density, args.seed)
+        expected = reference_distance(maze)
+        for name, solver in solvers.items():
+            stats = measure(solver, maze, args.repeat, not args.no_memory)
+            record = {
+                'solver': name,
+                'topology': topology,
+                'density': density,
+                'rows': rows,
+                'cols': cols,
+                'cells': rows * cols,
+                'expected': expected,
+                'result': stats['result'],
+                'correct': stats['result'] == expected,
+                'seconds': stats['seconds'],
+                'cells_per_sec': rows * cols / stats['seconds'] if stats['seconds'] else float('inf'),
+                'peak_bytes': stats['peak_bytes'],
+            }
+            records.append(record)
+            print(f"{name:>22} {topology:>11} d={density:<4} {rows * cols:>10} cells "
+                  f"{record['cells_per_sec']:>14,.0f} cells/s "
+                  f"{'ok' if record['correct'] else 'WRONG'}", file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'records': records,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            problems = compare(records, json.load(f)['records'], args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
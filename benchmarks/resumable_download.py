@@ -0,0 +1,107 @@
+"""
+Bytes transferred by the windsurf ``Downloader`` on a flaky link, with and
+without resuming via Range requests. The local test server cuts the
+connection of its first ``--drops`` responses after ``--cut`` of the file;
+``--no-ranges`` makes it ignore Range headers to exercise the fallback.
+
+Usage:
+    python benchmarks/resumable_download.py [--size-mb 8] [--drops 3] [--cut 0.6] [--no-ranges]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+
+from aiohttp import web
+
+from _common import load_module
+
+ETAG = '"v1"'
+
+
+def make_app(data: bytes, drops: int, cut: float, ranges: bool) -> web.Application:
+    app = web.Application()
+    app['stats'] = {'requests': 0, 'ranged': 0, 'bytes': 0, 'drops': drops}
+
+    async def serve(request: web.Request) -> web.StreamResponse:
+        stats = request.app['stats']
+        stats['requests'] += 1
+        offset = 0
+        match = re.fullmatch(r'bytes=(\d+)-', request.headers.get('Range', ''))
+        if ranges and match and request.headers.get('If-Range', ETAG) == ETAG:
+            offset = int(match.group(1))
+        if offset >= len(data) and offset:
+            return web.Response(status=416, headers={'Content-Range': f'bytes */{len(data)}'})
+
+        response = web.StreamResponse(status=206 if offset else 200, headers={'ETag': ETAG})
+        if offset:
+            stats['ranged'] += 1
+            response.headers['Content-Range'] = f'bytes {offset}-{len(data) - 1}/{len(data)}'
+        response.content_length = len(data) - offset
+        await response.prepare(request)
+
+        body = data[offset:]
+        if stats['drops'] > 0:
+            stats['drops'] -= 1
+            body = body[:int(len(data) * cut)]
+            await response.write(body)
+            stats['bytes'] += len(body)
+            request.transport.close()
+            return response
+        await response.write(body)
+        stats['bytes'] += len(body)
+        return response
+
+    app.router.add_get('/file', serve)
+    return app
+
+
+async def run(task3, directory: str, args) -> None:
+    data = os.urandom(args.size_mb << 20)
+    expected = hashlib.sha256(data).hexdigest()
+    print(f"{args.size_mb} MiB file, first {args.drops} responses cut after {args.cut:.0%}"
+          f"{', server ignores Range' if args.no_ranges else ''}")
+
+    for resume in (False, True):
+        app = make_app(data, args.drops, args.cut, not args.no_ranges)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/file"
+        target = os.path.join(directory, f'resume-{resume}.bin')
+        try:
+            async with task3.Downloader(resume=resume) as downloader:
+                assert await downloader.download(url, target)
+        finally:
+            await runner.cleanup()
+
+        with open(target, 'rb') as f:
+            assert hashlib.sha256(f.read()).hexdigest() == expected, 'corrupted download'
+        stats = app['stats']
+        print(f"resume={str(resume):<5}: {stats['bytes'] / len(data):5.2f}x file size transferred in "
+              f"{stats['requests']} requests ({stats['ranged']} ranged)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=8)
+    parser.add_argument('--drops', type=int, default=3, help='at most MAX_RETRIES (3)')
+    parser.add_argument('--cut', type=float, default=0.6, help='fraction of the file sent before a cut')
+    parser.add_argument('--no-ranges', action='store_true')
+    args = parser.parse_args()
+
+    # Importing the downloader creates its error log in the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        task3.logger.setLevel('ERROR')
+        task3.BACKOFF = 0.01
+        asyncio.run(run(task3, directory, args))
+
+
+if __name__ == '__main__':
+    main()
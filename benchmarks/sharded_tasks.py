@@ -0,0 +1,93 @@
+"""
+Compare task throughput of one event loop (CompactTaskManager) against
+ShardedTaskManager with several shard processes, in ``ides/windsurf/task2.py``.
+
+Each task burns a little CPU on the event loop, which is what caps a single
+loop. ``--skew`` makes tasks with even IDs heavier so hash routing leaves the
+shards unbalanced and work stealing has something to do.
+
+Usage:
+    python benchmarks/sharded_tasks.py [--tasks 20000] [--shards 1 2 4] [--skew 4]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from _common import load_module
+
+task2 = load_module('windsurf', 'task2')
+
+
+class SpinTask(task2.Task):
+    """Task doing ``work`` iterations of pure-Python arithmetic on the loop."""
+    __slots__ = ('work',)
+
+    def __init__(self, task_id: int, priority: int, work: int):
+        super().__init__(task_id, priority)
+        self.work = work
+
+    async def execute(self) -> bool:
+        total = 0
+        for i in range(self.work):
+            total += i * i
+        return True
+
+
+def spin_factory(task_id: int, priority: int, work: int) -> SpinTask:
+    return SpinTask(task_id, priority, work)
+
+
+def priority_of(task_id: int, levels: int) -> int:
+    """Priority level, independent of the even/odd cost skew."""
+    return task_id // 2 % levels
+
+
+def first_share(manager, levels: int) -> float:
+    """Share of top-priority tasks among the first 1/levels of completions."""
+    head = len(manager.result_ids) // levels
+    top = sum(1 for task_id in manager.result_ids[:head] if priority_of(task_id, levels) == levels - 1)
+    return top / head
+
+
+async def run(manager, n: int, work: int, skew: int, levels: int) -> float:
+    for task_id in range(n):
+        manager.add(task_id, priority_of(task_id, levels), work * (skew if task_id % 2 == 0 else 1))
+    start = time.perf_counter()
+    counts = await manager.execute_tasks()
+    elapsed = time.perf_counter() - start
+    assert counts == {task2.TaskStatus.DONE: n}, counts
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=20_000)
+    parser.add_argument('--work', type=int, default=2_000, help='loop iterations per task')
+    parser.add_argument('--skew', type=int, default=4, help='cost multiplier of even task IDs')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--route', choices=('hash', 'load'), default='hash')
+    parser.add_argument('--levels', type=int, default=10, help='number of priority levels')
+    args = parser.parse_args()
+
+    print(f"{args.tasks:,} tasks, {args.work} iterations (x{args.skew} for even IDs), "
+          f"{os.cpu_count()} CPUs")
+    if (os.cpu_count() or 1) < max(args.shards):
+        print("warning: fewer CPUs than shards; the numbers below cannot show scaling")
+    single = task2.CompactTaskManager(workers=8, task_factory=spin_factory)
+    elapsed = asyncio.run(run(single, args.tasks, args.work, args.skew, args.levels))
+    print(f"{'one loop':>10}: {args.tasks / elapsed:10,.0f} tasks/s  "
+          f"top priority first: {first_share(single, args.levels):.0%}")
+
+    for shards in args.shards:
+        manager = task2.ShardedTaskManager(shards=shards, workers=8, route=args.route,
+                                           task_factory=spin_factory)
+        elapsed = asyncio.run(run(manager, args.tasks, args.work, args.skew, args.levels))
+        print(f"{shards:>3} shards: {args.tasks / elapsed:10,.0f} tasks/s  "
+              f"top priority first: {first_share(manager, args.levels):.0%}  "
+              f"stolen: {manager.stolen:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure bytes per queued task for the TaskManager queues in
+``ides/windsurf/task2.py``.
+
+Usage:
+    python benchmarks/task_queue_memory.py [--tasks 1000000]
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import tracemalloc
+
+from _common import load_module
+
+
+class DictTask:
+    """Task with a per-instance ``__dict__``, as Task was before ``__slots__``."""
+
+    def __init__(self, task_id: int, priority: int):
+        self.task_id = task_id
+        self.priority = priority
+        self.depends_on = ()
+        self.estimated_duration = 1.0
+        self.timeout = None
+
+
+def measure(build) -> int:
+    """Return the bytes still allocated by ``build()`` while its result is alive."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--levels', type=int, default=10, help='number of distinct priorities')
+    args = parser.parse_args()
+
+    task2 = load_module('windsurf', 'task2')
+    logging.disable(logging.WARNING)
+    n, levels = args.tasks, args.levels
+
+    def dict_list():
+        return [DictTask(i, i % levels) for i in range(n)]
+
+    def batch_list():
+        manager = task2.TaskManager()
+        for i in range(n):
+            manager.add_task(task2.Task(i, i % levels))
+        return manager
+
+    def service_heap():
+        async def fill():
+            manager = task2.TaskManager()
+            await manager.start()
+            for i in range(n):
+                manager.submit(task2.Task(i, i % levels))
+            # Measure before any worker gets to run
+            allocated = tracemalloc.get_traced_memory()[0]
+            await manager.shutdown(wait=False)
+            return allocated
+
+        return asyncio.run(fill())
+
+    def compact_queue():
+        manager = task2.CompactTaskManager()
+        for i in range(n):
+            manager.add(i, i % levels)
+        return manager
+
+    results = {
+        'list of dict-based Task objects': measure(dict_list),
+        'TaskManager.add_task (slotted Task)': measure(batch_list),
+        'CompactTaskManager.add': measure(compact_queue),
+    }
+
+    # The service heap is measured from inside the loop, before shutdown
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    results['TaskManager.submit (heap + futures)'] = service_heap() - before
+    tracemalloc.stop()
+
+    print(f"{n:,} queued tasks, {levels} priority levels")
+    for name, size in results.items():
+        print(f"{name:>40}: {size / n:8.1f} bytes/task  ({size / 2 ** 20:8.1f} MiB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+"""
+Scheduling-overhead benchmark for the ``TaskManager``/``Task`` pairs in
+``ides/cursor/task2.py``, ``ides/windsurf/task2.py`` and
+``ides/github-copilot/task2.py``.
+
+Workloads:
+
+- ``noop``: ``--noop-tasks`` tasks that return immediately, one priority
+- ``io``: simulated I/O with mixed latencies (mostly 1 ms, some 10 ms and
+  100 ms), one priority
+- ``priority``: no-op tasks over ``--levels`` priority levels, added in
+  random order
+
+For every implementation and workload the harness records the makespan of
+``execute_tasks``, the dispatch overhead per task (makespan above the lower
+bound the implementation's concurrency allows, divided by the number of
+tasks), the number of priority inversions (pairs of tasks where the lower
+priority one started first) and, in a separate run, the tracemalloc peak.
+Results are written as JSON; ``--baseline`` compares against a previous run
+and exits non-zero on regressions.
+
+Usage:
+    python benchmarks/task_scheduler.py [--output results.json]
+    python benchmarks/task_scheduler.py --baseline results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from _common import load_module
+
+WORKLOADS = ('noop', 'io', 'priority')
+
+# Simulated I/O latencies in seconds and their weights
+IO_LATENCIES = ((0.001, 90), (0.01, 9), (0.1, 1))
+
+
+class Implementation:
+    """How to build and drive one TaskManager variant."""
+
+    def __init__(self, name: str, ide: str, concurrency: Optional[int],
+                 make_manager: Callable, run: Callable):
+        self.name = name
+        self.module = load_module(ide, 'task2')
+        self.concurrency = concurrency
+        self.make_manager = make_manager
+        self.run = run
+        self.task_class = make_task_class(self.module.Task)
+
+
+def make_task_class(base: type) -> type:
+    """Subclass an implementation's Task with a simulated workload."""
+
+    class BenchTask(base):
+        __slots__ = ('latency',)
+        started: List[Tuple[int, int]] = []
+
+        def __init__(self, task_id: int, priority: int, latency: float):
+            super().__init__(task_id, priority)
+            self.latency = latency
+
+        async def execute(self) -> bool:
+            BenchTask.started.append((self.task_id, self.priority))
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return True
+
+    return BenchTask
+
+
+def run_sync(manager) -> None:
+    """Drive a synchronous ``execute_tasks`` on a fresh event loop."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        manager.execute_tasks()
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def run_async(manager) -> None:
+    """Drive a coroutine ``execute_tasks``."""
+    asyncio.run(manager.execute_tasks())
+
+
+def implementations(workers: int) -> List[Implementation]:
+    return [
+        Implementation('cursor', 'cursor', None, lambda m: m.TaskManager(), run_sync),
+        Implementation('github-copilot', 'github-copilot', 1, lambda m: m.TaskManager(), run_async),
+        Implementation('windsurf', 'windsurf', 1, lambda m: m.TaskManager(), run_async),
+        Implementation(f'windsurf:workers={workers}', 'windsurf', workers,
+                       lambda m: m.TaskManager(workers=workers), run_async),
+    ]
+
+
+def generate(workload: str, args, seed: int) -> List[Tuple[int, int, float]]:
+    """Return ``(task_id, priority, latency)`` triples in insertion order."""
+    rng = random.Random(seed)
+    if workload == 'noop':
+        return [(i, 0, 0.0) for i in range(args.noop_tasks)]
+    if workload == 'io':
+        latencies = [latency for latency, _ in IO_LATENCIES]
+        weights = [weight for _, weight in IO_LATENCIES]
+        return [(i, 0, rng.choices(latencies, weights)[0]) for i in range(args.io_tasks)]
+    specs = [(i, rng.randrange(args.levels), 0.0) for i in range(args.priority_tasks)]
+    rng.shuffle(specs)
+    return specs
+
+
+def count_inversions(priorities: List[int]) -> int:
+    """Pairs started in the order lower priority, then higher (merge sort)."""
+    def sort(values: List[int]) -> Tuple[List[int], int]:
+        if len(values) <= 1:
+            return values, 0
+        middle = len(values) // 2
+        left, a = sort(values[:middle])
+        right, b = sort(values[middle:])
+        merged, count, i, j = [], a + b, 0, 0
+        while i < len(left) and j < len(right):
+            if left[i] >= right[j]:
+                merged.append(left[i])
+                i += 1
+            else:
+                # right[j] outranks every remaining left value but started later
+                count += len(left) - i
+                merged.append(right[j])
+                j += 1
+        merged.extend(left[i:])
+        merged.extend(right[j:])
+        return merged, count
+
+    return sort(priorities)[1]
+
+
+def execute(impl: Implementation, specs: List[Tuple[int, int, float]]) -> Tuple[float, float]:
+    """Add and run the tasks; returns (enqueue seconds, makespan seconds)."""
+    impl.task_class.started = []
+    start = time.perf_counter()
+    manager = impl.make_manager(impl.module)
+    for task_id, priority, latency in specs:
+        manager.add_task(impl.task_class(task_id, priority, latency))
+    enqueued = time.perf_counter()
+    impl.run(manager)
+    return enqueued - start, time.perf_counter() - enqueued
+
+
+def measure(impl: Implementation, workload: str, specs: List[Tuple[int, int, float]],
+            memory: bool) -> Dict:
+    enqueue_seconds, makespan = execute(impl, specs)
+    started = impl.task_class.started
+    latencies = [latency for _, _, latency in specs]
+    if impl.concurrency is None:
+        lower_bound = max(latencies)
+    else:
+        lower_bound = max(max(latencies), sum(latencies) / impl.concurrency)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        execute(impl, specs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'implementation': impl.name,
+        'workload': workload,
+        'tasks': len(specs),
+        'completed': len(started),
+        'enqueue_seconds': enqueue_seconds,
+        'makespan': makespan,
+        'lower_bound': lower_bound,
+        'overhead_per_task_us': max(0.0, makespan - lower_bound) / len(specs) * 1e6,
+        'priority_inversions': count_inversions([priority for _, priority in started]),
+        'peak_bytes': peak,
+    }
+
+
+def compare(records: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Return human-readable regressions of ``records`` against ``baseline``."""
+    previous = {(r['implementation'], r['workload'], r['tasks']): r for r in baseline}
+    problems = []
+    for record in records:
+        old = previous.get((record['implementation'], record['workload'], record['tasks']))
+        if old is None:
+            continue
+        label = '{implementation} {workload} tasks={tasks}'.format(**record)
+        if record['overhead_per_task_us'] > old['overhead_per_task_us'] * (1 + tolerance):
+            problems.append(f"{label}: overhead {old['overhead_per_task_us']:.1f} -> "
+                            f"{record['overhead_per_task_us']:.1f} us/task")
+        if record['priority_inversions'] > old['priority_inversions']:
+            problems.append(f"{label}: inversions {old['priority_inversions']} -> "
+                            f"{record['priority_inversions']}")
+        if old['peak_bytes'] and record['peak_bytes'] and \
+                record['peak_bytes'] > old['peak_bytes'] * (1 + tolerance):
+            problems.append(f"{label}: peak memory {old['peak_bytes']:,} -> {record['peak_bytes']:,} bytes")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--implementations', nargs='+', help='subset, e.g. cursor windsurf')
+    parser.add_argument('--noop-tasks', type=int, default=100_000)
+    parser.add_argument('--io-tasks', type=int, default=1_000)
+    parser.add_argument('--priority-tasks', type=int, default=10_000)
+    parser.add_argument('--levels', type=int, default=10, help='priority levels of the priority workload')
+    parser.add_argument('--workers', type=int, default=64, help='worker pool size of the pooled windsurf run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc peak-memory run')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    parser.add_argument('--baseline', help='previous JSON results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative overhead and memory growth against the baseline')
+    args = parser.parse_args()
+
+    # Keep per-task log lines of the implementations out of the measurement
+    logging.disable(logging.INFO)
+
+    impls = [impl for impl in implementations(args.workers)
+             if not args.implementations or impl.name in args.implementations]
+    records = []
+    for workload in args.workloads:
+        specs = generate(workload, args, args.seed)
+        for impl in impls:
+            record = measure(impl, workload, specs, not args.no_memory)
+            records.append(record)
+            peak = f"{record['peak_bytes'] / 2 ** 20:8.1f} MiB" if record['peak_bytes'] else ''
+            print(f"{impl.name:>20} {workload:>8} {len(specs):>7} tasks "
+                  f"makespan {record['makespan']:8.3f}s "
+                  f"overhead {record['overhead_per_task_us']:8.1f} us/task "
+                  f"inversions {record['priority_inversions']:>9} {peak}", file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'records': records,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            problems = compare(records, json.load(f)['records'], args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Show that ``download_pipeline`` in ``ides/windsurf/task3.py`` keeps the
+number of asyncio tasks and peak memory flat as the number of URLs grows,
+compared with ``download_files`` (one coroutine per URL), against a local
+aiohttp server.
+
+Usage:
+    python benchmarks/url_pipeline.py [--counts 1000 10000] [--workers 32]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web
+
+from _common import load_module
+
+
+async def hello(request: web.Request) -> web.Response:
+    return web.Response(text='hello')
+
+
+async def measure(coroutine) -> dict:
+    """Run ``coroutine`` while sampling the task count; returns stats."""
+    peak_tasks = 0
+
+    async def sample() -> None:
+        nonlocal peak_tasks
+        while True:
+            peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample())
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        results = await coroutine
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        sampler.cancel()
+    return {'results': results, 'seconds': elapsed, 'peak': peak, 'tasks': peak_tasks}
+
+
+async def run(task3, counts, workers: int) -> None:
+    app = web.Application()
+    app.router.add_get('/{n}', hello)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    try:
+        for count in counts:
+            urls = (f"{base}/{n}\n" for n in range(count))
+            stats = await measure(task3.download_pipeline(urls, workers=workers))
+            assert stats['results'] == {'success': count, 'failed': 0}, stats['results']
+            print(f"{'pipeline':>14} {count:>8,} URLs: peak {stats['peak'] / 2 ** 20:7.1f} MiB  "
+                  f"max {stats['tasks']:>6,} tasks  {count / stats['seconds']:7,.0f} URLs/s")
+
+            urls = [f"{base}/{n}" for n in range(count)]
+            stats = await measure(task3.download_files(urls))
+            assert stats['results'] == {'success': count, 'failed': 0}, stats['results']
+            print(f"{'download_files':>14} {count:>8,} URLs: peak {stats['peak'] / 2 ** 20:7.1f} MiB  "
+                  f"max {stats['tasks']:>6,} tasks  {count / stats['seconds']:7,.0f} URLs/s")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--workers', type=int, default=32)
+    args = parser.parse_args()
+
+    # The downloader writes its files (and error log) to the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        task3 = load_module('windsurf', 'task3')
+        task3.logger.setLevel('WARNING')
+        asyncio.run(run(task3, args.counts, args.workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark the weighted-grid solvers in ``ides/github-copilot/task1.py``
+(0-1 BFS and Dial's buckets) against a heapq Dijkstra and the plain BFS.
+
+Usage:
+    python benchmarks/weighted_bfs.py [--sizes 100 300 1000] [--max-cost 1 5]
+"""
+
+import argparse
+import heapq
+import random
+import time
+from typing import List
+
+from _common import load_module
+
+
+def random_grid(size: int, max_cost: int, wall: int, rng: random.Random) -> List[List[int]]:
+    """Generate a square cost grid with 20% walls and costs in ``0..max_cost``."""
+    grid = [[wall if rng.random() < 0.2 else rng.randint(0, max_cost) for _ in range(size)]
+            for _ in range(size)]
+    grid[0][0] = grid[-1][-1] = 0
+    return grid
+
+
+def dijkstra(grid: List[List[int]], wall: int) -> int:
+    """Reference heapq Dijkstra using the same cost convention as the solvers."""
+    rows, cols = len(grid), len(grid[0])
+    dist = {(0, 0): 0}
+    heap = [(0, 0, 0)]
+    while heap:
+        distance, row, col = heapq.heappop(heap)
+        if (row, col) == (rows - 1, cols - 1):
+            return distance
+        if distance > dist[(row, col)]:
+            continue
+        for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            nr, nc = row + dr, col + dc
+            if 0 <= nr < rows and 0 <= nc < cols and grid[nr][nc] != wall:
+                nd = distance + grid[nr][nc]
+                if nd < dist.get((nr, nc), float('inf')):
+                    dist[(nr, nc)] = nd
+                    heapq.heappush(heap, (nd, nr, nc))
+    return -1
+
+
+def timed(solver, *args) -> tuple:
+    """Return the solver result and its wall-clock time."""
+    start = time.perf_counter()
+    result = solver(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--max-cost', type=int, nargs='+', default=[1, 5])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    task1 = load_module('github-copilot', 'task1')
+    wall = task1.WALL
+    rng = random.Random(args.seed)
+
+    print(f"{'size':>6} {'C':>3} {'bfs (s)':>9} {'heapq (s)':>10} {'0-1 (s)':>9} {'dial (s)':>9}")
+    for size in args.sizes:
+        for max_cost in args.max_cost:
+            grid = random_grid(size, max_cost, wall, rng)
+            maze = [[1 if cost == wall else 0 for cost in row] for row in grid]
+            _, bfs_time = timed(task1.find_shortest_path, maze)
+            expected, heap_time = timed(dijkstra, grid, wall)
+            result, dial_time = timed(task1.find_shortest_path_dial, grid, max_cost)
+            assert result == expected, f"dial={result} dijkstra={expected}"
+            zero_one = '-'
+            if max_cost == 1:
+                result, zero_one_time = timed(task1.find_shortest_path_01, grid)
+                assert result == expected, f"0-1={result} dijkstra={expected}"
+                zero_one = f"{zero_one_time:.4f}"
+            print(f"{size:>6} {max_cost:>3} {bfs_time:>9.4f} {heap_time:>10.4f} "
+                  f"{zero_one:>9} {dial_time:>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
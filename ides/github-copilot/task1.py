@@ -1,5 +1,5 @@
 from collections import deque
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
 def find_shortest_path(maze: List[List[int]]) -> int:
     if not maze or not maze[0]:
@@ -29,6 +29,175 @@ def find_shortest_path(maze: List[List[int]]) -> int:
     
     return -1
 
+def find_shortest_path_bitset(maze: List[List[int]]) -> int:
+    # 每行用一个 Python 大整数表示, 第 c 位对应第 c 列;
+    # 一步 BFS 对整行做移位/或/与运算, 逐格循环交给 C 层的大整数实现
+    if not maze or not maze[0]:
+        return -1
+
+    rows, cols = len(maze), len(maze[0])
+    if maze[0][0] == 1 or maze[rows-1][cols-1] == 1:
+        return -1
+
+    # remaining[r]: 第 r 行尚未访问的通路格子
+    remaining = [
+        int(''.join('1' if cell == 0 else '0' for cell in reversed(row)), 2)
+        for row in maze
+    ]
+    remaining[0] &= ~1
+    target_row, target_bit = rows - 1, 1 << (cols - 1)
+
+    # 只保存非空的前沿行, 螺旋等狭长迷宫每步只需处理一两行
+    frontier: Dict[int, int] = {0: 1}
+    distance = 0
+
+    while frontier:
+        if frontier.get(target_row, 0) & target_bit:
+            return distance
+        distance += 1
+
+        spread: Dict[int, int] = {}
+        for row, bits in frontier.items():
+            spread[row] = spread.get(row, 0) | (bits << 1) | (bits >> 1)
+            if row > 0:
+                spread[row - 1] = spread.get(row - 1, 0) | bits
+            if row + 1 < rows:
+                spread[row + 1] = spread.get(row + 1, 0) | bits
+
+        frontier = {}
+        for row, bits in spread.items():
+            bits &= remaining[row]
+            if bits:
+                remaining[row] ^= bits
+                frontier[row] = bits
+
+    return -1
+
+SOLVERS: Dict[str, Callable[[List[List[int]]], int]] = {
+    'deque': find_shortest_path,
+}
+
+# 位集 BFS 每步的开销与前沿所占的行数成正比, 与前沿格子数无关:
+# 开阔或随机迷宫前沿很宽, 比 deque 快约 2x (benchmarks/bitset_bfs.py);
+# 螺旋、DFS 生成的狭长迷宫前沿只有一两个格子, 反而比 deque 慢 (只有其 0.55-0.75 倍),
+# 因此不放进默认的 SOLVERS 对比, maze_suite 中需用 --solvers github-copilot:bitset 显式选择
+EXTRA_SOLVERS: Dict[str, Callable[[List[List[int]]], int]] = {
+    'bitset': find_shortest_path_bitset,
+}
+
+# 带权网格: grid[r][c] 为进入该格子的代价 (非负整数), WALL 表示墙;
+# 路径长度为除起点外所有经过格子的代价之和, 全 1 网格时与 find_shortest_path 一致
+WALL = -1
+
+def _flatten_weighted(grid: List[List[int]]) -> Optional[Tuple[List[int], int, int]]:
+    # 展平成一维并在四周补一圈 WALL, 邻居就是 index ±1 / ±width, 无需边界判断
+    # 返回 (cells, width, target), 起点下标为 width + 1
+    if not grid or not grid[0]:
+        return None
+
+    rows, cols = len(grid), len(grid[0])
+    if grid[0][0] == WALL or grid[rows-1][cols-1] == WALL:
+        return None
+
+    width = cols + 2
+    cells = [WALL] * width
+    for row in grid:
+        cells.append(WALL)
+        cells.extend(row)
+        cells.append(WALL)
+    cells.extend([WALL] * width)
+    return cells, width, rows * width + cols
+
+def find_shortest_path_01(grid: List[List[int]]) -> int:
+    # 0-1 BFS: 代价为 0 的格子放到队首, 代价为 1 的放到队尾, 出队顺序即距离顺序
+    flat = _flatten_weighted(grid)
+    if flat is None:
+        return -1
+    cells, width, target = flat
+    if any(cost not in (0, 1, WALL) for cost in cells):
+        raise ValueError("find_shortest_path_01 只支持代价 0/1 (或 WALL)")
+
+    steps = (1, width, -1, -width)
+    start = width + 1
+    dist = [-1] * len(cells)
+    settled = bytearray(len(cells))
+    dist[start] = 0
+    queue = deque([start])
+
+    while queue:
+        index = queue.popleft()
+        if settled[index]:
+            continue
+        settled[index] = 1
+        distance = dist[index]
+        if index == target:
+            return distance
+
+        for step in steps:
+            neighbour = index + step
+            cost = cells[neighbour]
+            if cost == WALL or settled[neighbour]:
+                continue
+            new_distance = distance + cost
+            if dist[neighbour] == -1 or new_distance < dist[neighbour]:
+                dist[neighbour] = new_distance
+                if cost == 0:
+                    queue.appendleft(neighbour)
+                else:
+                    queue.append(neighbour)
+
+    return -1
+
+def find_shortest_path_dial(grid: List[List[int]], max_cost: Optional[int] = None) -> int:
+    # Dial 桶队列: 代价上界为 C 时只需 C + 1 个循环桶, 入队/出队都是 O(1)
+    flat = _flatten_weighted(grid)
+    if flat is None:
+        return -1
+    cells, width, target = flat
+    if max_cost is None:
+        max_cost = max(cells)
+    if any(cost < WALL or cost > max_cost for cost in cells):
+        raise ValueError(f"格子代价必须在 0..{max_cost} 之间 (或 WALL)")
+
+    steps = (1, width, -1, -width)
+    start = width + 1
+    dist = [-1] * len(cells)
+    dist[start] = 0
+    buckets: List[List[int]] = [[] for _ in range(max_cost + 1)]
+    buckets[0].append(start)
+    pending = 1
+    distance = 0
+
+    while pending:
+        bucket = buckets[distance % len(buckets)]
+        while bucket:
+            index = bucket.pop()
+            pending -= 1
+            if dist[index] != distance:
+                continue  # 已被更短的距离更新过的旧条目
+            if index == target:
+                return distance
+
+            for step in steps:
+                neighbour = index + step
+                cost = cells[neighbour]
+                if cost == WALL:
+                    continue
+                new_distance = distance + cost
+                if dist[neighbour] == -1 or new_distance < dist[neighbour]:
+                    dist[neighbour] = new_distance
+                    buckets[new_distance % len(buckets)].append(neighbour)
+                    pending += 1
+        distance += 1
+
+    return -1
+
+# find_shortest_path_dial 还接受可选的 max_cost, 统一按 solver(grid) 调用
+WEIGHTED_SOLVERS: Dict[str, Callable[..., int]] = {
+    '0-1': find_shortest_path_01,
+    'dial': find_shortest_path_dial,
+}
+
 # 测试用例
 def test_find_shortest_path():
     test_cases = [
@@ -52,13 +221,63 @@ def test_find_shortest_path():
                 [0]
             ],
             'expected': 0
+        },
+        {
+            'maze': [
+                [0,1,0,0,0],
+                [0,1,0,1,0],
+                [0,0,0,1,0]
+            ],
+            'expected': 10
+        }
+    ]
+
+    for mode, solver in {**SOLVERS, **EXTRA_SOLVERS}.items():
+        for i, test in enumerate(test_cases, 1):
+            result = solver(test['maze'])
+            assert result == test['expected'], f"[{mode}] 测试用例 {i} 失败: 期望 {test['expected']}, 得到 {result}"
+            print(f"[{mode}] 测试用例 {i} 通过")
+
+    # 带权网格: 0/1 迷宫换算成 1=通路代价、WALL=墙 后结果应一致
+    for mode, solver in WEIGHTED_SOLVERS.items():
+        for i, test in enumerate(test_cases, 1):
+            grid = [[WALL if cell == 1 else 1 for cell in row] for row in test['maze']]
+            result = solver(grid)
+            assert result == test['expected'], f"[{mode}] 测试用例 {i} 失败: 期望 {test['expected']}, 得到 {result}"
+            print(f"[{mode}] 测试用例 {i} 通过")
+
+    weighted_cases = [
+        {
+            # 沿左侧和底边代价为 0 的格子走
+            'grid': [
+                [0,1,1],
+                [0,WALL,1],
+                [0,0,0]
+            ],
+            'expected': 0
+        },
+        {
+            'grid': [
+                [0,1,0],
+                [1,1,0],
+                [WALL,0,0]
+            ],
+            'expected': 1
         }
     ]
+    for mode, solver in WEIGHTED_SOLVERS.items():
+        for i, test in enumerate(weighted_cases, 1):
+            result = solver(test['grid'])
+            assert result == test['expected'], f"[{mode}] 带权测试用例 {i} 失败: 期望 {test['expected']}, 得到 {result}"
+            print(f"[{mode}] 带权测试用例 {i} 通过")
 
-    for i, test in enumerate(test_cases, 1):
-        result = find_shortest_path(test['maze'])
-        assert result == test['expected'], f"测试用例 {i} 失败: 期望 {test['expected']}, 得到 {result}"
-        print(f"测试用例 {i} 通过")
+    slow_terrain = [
+        [0,5,1],
+        [1,9,1],
+        [1,1,3]
+    ]
+    assert find_shortest_path_dial(slow_terrain) == 6, "Dial 测试用例失败"
+    print("[dial] 慢速地形测试用例通过")
 
 if __name__ == "__main__":
     test_find_shortest_path()
@@ -0,0 +1,162 @@
+"""
+Log pipeline for the event-loop scripts in this directory: logging calls
+only enqueue a record and a background thread formats and writes them in
+batches.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from typing import List, Optional
+
+# Marks the end of the records; unlike ``None`` it is never a valid record
+_STOP = object()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted, so that building the
+    message (``%``-style arguments, exception text) also happens on the
+    listener thread. Arguments must not be mutated after the logging call.
+
+    Closing the handler (``logging.shutdown()`` does so at exit) stops the
+    listener it feeds, so that the remaining records are written.
+    """
+    def __init__(self, records: queue.SimpleQueue, listener: Optional['BatchingQueueListener'] = None):
+        super().__init__(records)
+        self.listener = listener
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def close(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+        super().close()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that hands records to its handlers in batches.
+
+    The listener thread takes every record already waiting (up to
+    ``batch_size``) at once; stream and file handlers write the whole
+    batch with a single write and flush instead of one per record.
+    """
+    def __init__(self, records: queue.SimpleQueue, *handlers: logging.Handler, batch_size: int = 512):
+        super().__init__(records, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the listener thread; does nothing if it is running."""
+        if self.worker is None:
+            self.worker = threading.Thread(target=self.serve, name='log-pipeline', daemon=True)
+            self.worker.start()
+
+    def stop(self) -> None:
+        """Write the remaining records and stop the thread; safe to call twice."""
+        if self.worker is not None:
+            self.enqueue_sentinel()
+            self.worker.join()
+            self.worker = None
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put_nowait(_STOP)
+
+    def restart(self, records: queue.SimpleQueue) -> None:
+        """
+        Continue on a fresh queue with a new thread.
+
+        Used in a forked child, which inherits the queue and the listener
+        but not its thread, so nothing would write the child's records.
+
+        Args:
+            records: Queue the listener reads from now on
+        """
+        self.queue = records
+        self.worker = None
+        self.start()
+
+    def serve(self) -> None:
+        """Body of the listener thread: write batches until the sentinel."""
+        while True:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            stopping = _STOP in batch
+            self.handle_batch([self.prepare(record) for record in batch if record is not _STOP])
+            if stopping:
+                return
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """
+        Pass a batch of records to every handler whose level accepts them.
+
+        Args:
+            records: Records in the order they were logged
+        """
+        for handler in self.handlers:
+            accepted = [record for record in records
+                        if record.levelno >= handler.level and handler.filter(record)]
+            if not accepted:
+                continue
+            if not isinstance(handler, logging.StreamHandler) or handler.stream is None:
+                for record in accepted:
+                    handler.handle(record)
+                continue
+
+            handler.acquire()
+            try:
+                handler.stream.write(''.join(handler.format(record) + handler.terminator
+                                             for record in accepted))
+                handler.flush()
+            except Exception:
+                handler.handleError(accepted[0])
+            finally:
+                handler.release()
+
+
+def start_log_pipeline(target: Optional[logging.Logger] = None,
+                       batch_size: int = 512) -> BatchingQueueListener:
+    """
+    Move the handlers of a logger behind a queue, so that logging calls on
+    the event loop only enqueue a record and a background thread formats
+    and writes them in batches.
+
+    A process forked afterwards (e.g. a shard) gets its own queue and
+    listener thread; it has to close the handler (``logging.shutdown()``)
+    before it exits for its last records to be written.
+
+    Args:
+        target: Logger whose handlers to move (defaults to the root logger)
+        batch_size: Maximum number of records written at once
+
+    Returns:
+        BatchingQueueListener: The started listener; ``stop()`` writes the
+        remaining records (also done at exit)
+    """
+    target = target or logging.getLogger()
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = BatchingQueueListener(records, *target.handlers, batch_size=batch_size)
+    handler = DeferredQueueHandler(records, listener)
+    for moved in list(target.handlers):
+        target.removeHandler(moved)
+    target.addHandler(handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    def restart_in_child() -> None:
+        if listener.worker is not None:
+            handler.queue = queue.SimpleQueue()
+            listener.restart(handler.queue)
+
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=restart_in_child)
+    return listener
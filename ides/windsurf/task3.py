@@ -1,13 +1,35 @@
 import asyncio
+import hashlib
+import importlib.util
 import logging
 import os
 import re
-from typing import Dict, List, Tuple
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import AsyncIterable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
 from urllib.parse import urlparse
 
 import aiohttp
 import aiofiles
 
+try:
+    from queued_logging import start_log_pipeline
+except ModuleNotFoundError as e:
+    if e.name != 'queued_logging':
+        raise
+    # Loaded by file path with this directory not on sys.path (e.g. by the
+    # benchmarks): load the sibling by path too, once for task2 and task3
+    _spec = importlib.util.spec_from_file_location(
+        'queued_logging', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'queued_logging.py'))
+    _queued_logging = importlib.util.module_from_spec(_spec)
+    sys.modules['queued_logging'] = _queued_logging
+    _spec.loader.exec_module(_queued_logging)
+    start_log_pipeline = _queued_logging.start_log_pipeline
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,11 +41,207 @@ logging.basicConfig(
 )
 logger = logging.getLogger('url_downloader')
 
+
 MAX_RETRIES = 3
+BACKOFF = 1.0  # seconds before the first retry, doubled for each further one
 TIMEOUT = 30  # seconds
+CHUNK_SIZE = 64 * 1024  # bytes read per chunk in streaming mode
+
+
+def filename_for(url: str) -> str:
+    """Local file name for a URL: its host name (without port) plus ``.html``."""
+    return urlparse(url).netloc.split(':')[0] + '.html'
+
+
+def check_status(response: aiohttp.ClientResponse) -> None:
+    """Raise ClientResponseError unless the response is 200 OK."""
+    if response.status != 200:
+        raise aiohttp.ClientResponseError(
+            response.request_info,
+            response.history,
+            status=response.status,
+            message=f"HTTP Error {response.status}: {response.reason}"
+        )
+
+
+def host_of(url: str) -> Optional[str]:
+    """Key of per-host state for a URL: its lower-cased ``host[:port]``."""
+    netloc = urlparse(url).netloc.lower()
+    return netloc or None
+
+
+def is_host_failure(error: BaseException) -> bool:
+    """
+    Whether an error says something about the health of the host:
+    connection errors, timeouts, broken bodies, 5xx and 429. Other HTTP
+    errors (404, 403, ...) are answers from a working server.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
 
 
-async def download_url(session: aiohttp.ClientSession, url: str, retry_count: int = 0) -> Tuple[str, bytes, bool]:
+class HostState:
+    """
+    Circuit breaker and adaptive concurrency limit of one host.
+    
+    The breaker opens after ``failure_threshold`` consecutive failures:
+    while open, requests to the host fail fast instead of waiting for
+    timeouts and backoff. After ``cooldown`` seconds a single probe is let
+    through (half-open); success closes the breaker, failure opens it again
+    for twice as long, up to ``max_cooldown``.
+    
+    The concurrency limit follows AIMD: each success below the latency
+    target adds ``1 / limit`` (about one slot per round trip), while a
+    failure, or a smoothed latency above ``latency_factor`` times the
+    fastest one seen, halves it - at most once per round trip, so one
+    burst of errors counts as one congestion signal.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+    LATENCY_SLACK = 0.01  # seconds of jitter never treated as congestion
+    
+    def __init__(self, host: str, max_limit: int = 10, initial_limit: int = 2,
+                 failure_threshold: int = 5, cooldown: float = 5.0, max_cooldown: float = 300.0,
+                 latency_factor: float = 2.0):
+        """
+        Initialize a closed breaker.
+        
+        Args:
+            host: Host the state belongs to (for log messages)
+            max_limit: Upper bound of the concurrency limit
+            initial_limit: Concurrency limit to start from
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown: Seconds the breaker stays open at first
+            max_cooldown: Upper bound of the doubling cooldown
+            latency_factor: Smoothed latency over the fastest one that
+                counts as congestion
+        """
+        self.host = host
+        self.max_limit = max_limit
+        self.limit = float(min(initial_limit, max_limit))
+        self.in_flight = 0
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.latency_factor = latency_factor
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_until = 0.0
+        self.latency: Optional[float] = None  # EWMA of time to response headers
+        self.min_latency: Optional[float] = None
+        self._decreased_at = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+    
+    def is_open(self) -> bool:
+        """True while requests to the host should fail fast."""
+        return self.state == self.OPEN and time.monotonic() < self.open_until
+    
+    def has_capacity(self) -> bool:
+        """True if ``try_acquire`` would succeed."""
+        if self.is_open():
+            return False
+        # Once the cooldown is over, only a single probe is allowed
+        capacity = int(self.limit) if self.state == self.CLOSED else 1
+        return self.in_flight < capacity
+    
+    def try_acquire(self) -> bool:
+        """
+        Take a concurrency slot if one is free (one probe when half-open).
+        
+        Returns:
+            bool: True if the caller may send a request; call ``release``
+            when it is done
+        """
+        if not self.has_capacity():
+            return False
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+        self.in_flight += 1
+        return True
+    
+    async def acquire(self) -> bool:
+        """
+        Wait for a concurrency slot (one probe when half-open).
+        
+        Returns:
+            bool: True once the caller may send a request (call ``release``
+            when it is done), False as soon as the breaker is open
+        """
+        while not self.try_acquire():
+            if self.is_open():
+                return False
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Pass the wakeup on to the next waiter
+                    self._wake()
+                raise
+        return True
+    
+    def release(self) -> None:
+        """Give back a slot taken with ``try_acquire`` or ``acquire``."""
+        self.in_flight -= 1
+        self._wake()
+    
+    def _wake(self) -> None:
+        """Wake waiters for the free slots, or all of them once the breaker is open."""
+        free = len(self._waiters) if self.is_open() else max(
+            0, (int(self.limit) if self.state == self.CLOSED else 1) - self.in_flight)
+        while free and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+    
+    def record_success(self, latency: float) -> None:
+        """Record a response, with the seconds it took to arrive."""
+        self.failures = 0
+        if self.state != self.CLOSED:
+            logger.info("Circuit for %s closed", self.host)
+            self.state = self.CLOSED
+            self.cooldown = self.base_cooldown
+        
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+        target = self.min_latency * self.latency_factor + self.LATENCY_SLACK
+        if self.latency > target:
+            self._decrease()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+    
+    def record_failure(self) -> None:
+        """Record a failed request; may open the breaker."""
+        self.failures += 1
+        self._decrease()
+        now = time.monotonic()
+        if self.state == self.OPEN and now < self.open_until:
+            # Requests sent before the breaker opened are still failing
+            return
+        if self.state != self.CLOSED or self.failures >= self.failure_threshold:
+            if self.state != self.CLOSED:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self.state = self.OPEN
+            self.open_until = now + self.cooldown
+            logger.warning("Circuit for %s open for %.1fs after %d failures",
+                           self.host, self.cooldown, self.failures)
+            # Let everyone waiting for a slot fail fast
+            self._wake()
+    
+    def _decrease(self) -> None:
+        """Halve the limit, at most once per smoothed round trip."""
+        now = time.monotonic()
+        if now - self._decreased_at >= (self.latency or 0.0):
+            self.limit = max(1.0, self.limit / 2)
+            self._decreased_at = now
+
+
+async def download_url(session: aiohttp.ClientSession, url: str, retry_count: int = 0,
+                       host: Optional[HostState] = None) -> Tuple[str, bytes, bool]:
     """
     Download content from a URL with retry logic.
     
@@ -31,47 +249,416 @@ async def download_url(session: aiohttp.ClientSession, url: str, retry_count: in
         session: The aiohttp client session
         url: The URL to download
         retry_count: Current retry attempt
+        host: State of the URL's host; every attempt is recorded in it and
+            retries stop once its circuit is open
         
     Returns:
         Tuple containing the filename, content and success status
     """
     try:
-        # Extract domain for the filename
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-        
-        # Clean up domain for filename (remove port if present)
-        filename = domain.split(':')[0] + '.html'
+        filename = filename_for(url)
         
         # Download with timeout
+        started = time.monotonic()
         async with session.get(url, timeout=TIMEOUT) as response:
-            if response.status != 200:
-                raise aiohttp.ClientResponseError(
-                    response.request_info,
-                    response.history,
-                    status=response.status,
-                    message=f"HTTP Error {response.status}: {response.reason}"
-                )
-            
+            latency = time.monotonic() - started
+            check_status(response)
             content = await response.read()
+            if host is not None:
+                host.record_success(latency)
             return filename, content, True
             
     except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        if host is not None and is_host_failure(e):
+            host.record_failure()
+            if host.is_open():
+                logger.error("Giving up on %s: circuit for %s is open. Error: %s", url, host.host, e)
+                return url, b'', False
         # Handle network-related errors with retry logic
         if retry_count < MAX_RETRIES:
-            logger.warning(f"Download failed for {url}. Retrying ({retry_count + 1}/{MAX_RETRIES})... Error: {str(e)}")
+            logger.warning("Download failed for %s. Retrying (%d/%d)... Error: %s",
+                           url, retry_count + 1, MAX_RETRIES, e)
             # Exponential backoff: 1s, 2s, 4s
-            await asyncio.sleep(2 ** retry_count)
-            return await download_url(session, url, retry_count + 1)
+            await asyncio.sleep(BACKOFF * 2 ** retry_count)
+            return await download_url(session, url, retry_count + 1, host)
         else:
-            logger.error(f"Failed to download {url} after {MAX_RETRIES} attempts. Error: {str(e)}")
+            logger.error("Failed to download %s after %d attempts. Error: %s", url, MAX_RETRIES, e)
             return url, b'', False
     except Exception as e:
         # Handle unexpected errors
-        logger.error(f"Unexpected error downloading {url}: {str(e)}")
+        logger.error("Unexpected error downloading %s: %s", url, e)
         return url, b'', False
 
 
+class Fetched(NamedTuple):
+    """Outcome of a successful streaming download."""
+    status: int  # 200, or 304 if the local copy is still current
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: Optional[str]  # None for 304
+    size: Optional[int]  # None for 304
+
+
+def part_path_for(url: str, filename: str) -> str:
+    """Partial-download file of a URL, next to its destination and unique per URL."""
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, f".{name}.{hashlib.sha1(url.encode()).hexdigest()[:16]}.part")
+
+
+# Part files being written by a download in this process
+_parts_in_use: Set[str] = set()
+
+
+def _validator_path(part_path: str) -> str:
+    """File holding the validator (ETag or Last-Modified) a part was downloaded under."""
+    return part_path + '.validator'
+
+
+def _read_validator(part_path: str) -> Optional[str]:
+    try:
+        with open(_validator_path(part_path)) as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+def _write_validator(part_path: str, validator: Optional[str]) -> None:
+    if validator:
+        with open(_validator_path(part_path), 'w') as f:
+            f.write(validator)
+    elif os.path.exists(_validator_path(part_path)):
+        os.remove(_validator_path(part_path))
+
+
+def _discard_part(part_path: str) -> None:
+    """Remove a part file and its validator, if present."""
+    for path in (part_path, _validator_path(part_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def parse_content_range(value: Optional[str]) -> Optional[Tuple[int, int, Optional[int]]]:
+    """Parse ``bytes start-end/total`` into (start, end, total); total is None for ``*``."""
+    match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+|\*)', (value or '').strip())
+    if match is None:
+        return None
+    start, end, total = match.groups()
+    return int(start), int(end), None if total == '*' else int(total)
+
+
+async def stream_to_file(session: aiohttp.ClientSession, url: str, filename: str,
+                         chunk_size: int = CHUNK_SIZE, headers: Optional[Dict[str, str]] = None,
+                         resume: bool = True, host: Optional[HostState] = None) -> Optional[Fetched]:
+    """
+    Download a URL straight to disk, one chunk at a time.
+    
+    The body is written to a ``.part`` file next to ``filename`` and renamed
+    over it once complete, so readers never see a partial file and memory
+    use is one chunk regardless of the body size. The SHA-256 of the body
+    is computed on the way.
+    
+    When a transfer breaks off, the ``.part`` file is kept and the retry
+    asks for the rest with ``Range: bytes=N-``, guarded by ``If-Range``
+    with the validator the part was downloaded under; if the server sent
+    neither ``ETag`` nor ``Last-Modified``, the retry starts over. A 206 whose
+    ``Content-Range`` starts at N is appended; a 200 means the server
+    ignored the range (or the content changed) and the file is rewritten
+    from scratch. The validator is kept in a ``.part.validator`` file, so
+    a part left by an earlier run is resumed the same way; a leftover part
+    without one is discarded, as nothing tells whether it matches the
+    current body.
+    
+    A second download of the same URL to the same file while the first is
+    running writes to a temporary part of its own and does not resume.
+    
+    Args:
+        session: The aiohttp client session
+        url: The URL to download
+        filename: Destination path
+        chunk_size: Bytes read from the response per chunk
+        headers: Extra request headers; with conditional headers a
+            304 Not Modified leaves ``filename`` untouched
+        resume: Keep partial downloads and continue them on retry
+        host: State of the URL's host; every attempt is recorded in it and
+            retries stop once its circuit is open
+        
+    Returns:
+        Fetched if the file was saved or is unchanged, None otherwise
+    """
+    part_path = part_path_for(url, filename)
+    shared = part_path in _parts_in_use
+    if shared:
+        directory, name = os.path.split(part_path)
+        fd, part_path = tempfile.mkstemp(prefix=name[:-len('.part')] + '.', suffix='.part', dir=directory)
+        os.close(fd)
+        resume = False
+    _parts_in_use.add(part_path)
+    try:
+        if_range = _read_validator(part_path) if resume else None
+        if resume and if_range is None:
+            # Nothing tells whether a part left by an earlier run matches the current body
+            _discard_part(part_path)
+        return await _stream_to_part(session, url, filename, part_path, chunk_size, headers, resume,
+                                     if_range, 0, host)
+    finally:
+        _parts_in_use.discard(part_path)
+        if shared:
+            _discard_part(part_path)
+
+
+async def _stream_to_part(session: aiohttp.ClientSession, url: str, filename: str, part_path: str,
+                          chunk_size: int, headers: Optional[Dict[str, str]], resume: bool,
+                          if_range: Optional[str], retry_count: int,
+                          host: Optional[HostState]) -> Optional[Fetched]:
+    """
+    One attempt of ``stream_to_file`` through ``part_path``, retrying itself.
+    
+    Args:
+        if_range: Validator the part was downloaded under, if any
+        retry_count: Current retry attempt
+    """
+    offset = os.path.getsize(part_path) if resume and os.path.exists(part_path) else 0
+    request_headers = dict(headers or {})
+    if offset:
+        # Conditional headers refer to the complete cached file, not to the part
+        request_headers.pop('If-None-Match', None)
+        request_headers.pop('If-Modified-Since', None)
+        request_headers['Range'] = f"bytes={offset}-"
+        if if_range:
+            request_headers['If-Range'] = if_range
+    
+    try:
+        started = time.monotonic()
+        async with session.get(url, timeout=TIMEOUT, headers=request_headers or None) as response:
+            latency = time.monotonic() - started
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if response.status == 304 and headers:
+                if host is not None:
+                    host.record_success(latency)
+                return Fetched(304, etag, last_modified, None, None)
+            if response.status == 416 and offset:
+                # The part is not a prefix the server can continue; start over
+                _discard_part(part_path)
+                return await _stream_to_part(session, url, filename, part_path, chunk_size, headers,
+                                             resume, None, retry_count, host)
+            
+            digest = hashlib.sha256()
+            if response.status == 206 and offset:
+                content_range = parse_content_range(response.headers.get('Content-Range'))
+                if content_range is None or content_range[0] != offset:
+                    raise aiohttp.ClientPayloadError(
+                        f"Content-Range {response.headers.get('Content-Range')!r} does not start at {offset}")
+                async with aiofiles.open(part_path, 'rb') as f:
+                    while chunk := await f.read(chunk_size):
+                        digest.update(chunk)
+                mode, size = 'ab', offset
+            else:
+                check_status(response)
+                mode, size = 'wb', 0
+                if_range = etag or last_modified
+                if resume:
+                    _write_validator(part_path, if_range)
+            
+            async with aiofiles.open(part_path, mode) as f:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await f.write(chunk)
+        os.replace(part_path, filename)
+        _discard_part(part_path)
+        if host is not None:
+            host.record_success(latency)
+        return Fetched(200, etag, last_modified, digest.hexdigest(), size)
+    
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        if not resume or if_range is None:
+            # Without a validator nothing tells whether the rest still
+            # belongs to the same body; start over
+            _discard_part(part_path)
+        if host is not None and is_host_failure(e):
+            host.record_failure()
+            if host.is_open():
+                logger.error("Giving up on %s: circuit for %s is open. Error: %s", url, host.host, e)
+                return None
+        if retry_count < MAX_RETRIES:
+            logger.warning("Download failed for %s. Retrying (%d/%d)... Error: %s",
+                           url, retry_count + 1, MAX_RETRIES, e)
+            await asyncio.sleep(BACKOFF * 2 ** retry_count)
+            return await _stream_to_part(session, url, filename, part_path, chunk_size, headers,
+                                         resume, if_range, retry_count + 1, host)
+        logger.error("Failed to download %s after %d attempts. Error: %s", url, MAX_RETRIES, e)
+        return None
+    except Exception as e:
+        _discard_part(part_path)
+        logger.error("Unexpected error downloading %s: %s", url, e)
+        return None
+
+
+class CacheEntry(NamedTuple):
+    """What is known about the last download of a URL."""
+    url: str
+    path: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    sha256: str
+    size: int
+    mtime_ns: int
+    fetched_at: float
+
+
+class CacheIndex:
+    """
+    On-disk index of downloaded URLs in SQLite: validators (ETag,
+    Last-Modified), content hash and size, plus the size and mtime of the
+    saved file so that a file changed behind our back is re-downloaded.
+    Every call is a single statement on the primary key.
+    """
+    def __init__(self, path: str):
+        """
+        Open (or create) an index database.
+        
+        Args:
+            path: SQLite database file
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+    
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Look up a URL.
+        
+        Returns:
+            CacheEntry, or None if the URL was never downloaded
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM entries WHERE url = ?", (url,)).fetchone()
+        return CacheEntry(*row) if row else None
+    
+    def put(self, entry: CacheEntry) -> None:
+        """Insert or replace the entry of a URL."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", entry)
+    
+    def touch(self, url: str) -> None:
+        """Record that a URL was revalidated just now."""
+        with self._lock:
+            self._db.execute("UPDATE entries SET fetched_at = ? WHERE url = ?", (time.time(), url))
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+class ContentStore:
+    """
+    Content-addressed, deduplicated storage of downloaded bodies.
+    
+    Each distinct body is stored once, read-only, under
+    ``objects/ab/cd/<sha256>`` below ``root``; the two levels of 256
+    directories keep every directory small however many objects there
+    are. Which URL has which body is recorded in ``index.sqlite``, so URLs
+    on the same host no longer overwrite each other and mirrors of the
+    same file share one object. Downloads are staged in ``staging/`` on
+    the same filesystem, so adding an object is a rename.
+    """
+    def __init__(self, root: str):
+        """
+        Open (or create) a store.
+        
+        Args:
+            root: Directory of the store
+        """
+        self.root = os.path.abspath(root)
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.staging_dir = os.path.join(self.root, 'staging')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, 'index.sqlite'),
+                                   isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS urls_sha256 ON urls (sha256)")
+    
+    def object_path(self, sha256: str) -> str:
+        """Path of the object with the given hex SHA-256."""
+        return os.path.join(self.objects_dir, sha256[:2], sha256[2:4], sha256)
+    
+    def staging_path(self, url: str) -> str:
+        """Where a download of ``url`` is written before it is added."""
+        return os.path.join(self.staging_dir, hashlib.sha1(url.encode()).hexdigest())
+    
+    def add(self, url: str, staged: str, sha256: str, size: int) -> str:
+        """
+        Move a staged download into the store and map ``url`` to it.
+        
+        If an object with the same hash exists, the staged file is deleted
+        instead (the URL is mapped to the existing object).
+        
+        Args:
+            url: The URL the body was downloaded from
+            staged: Path of the complete download, e.g. ``staging_path(url)``
+            sha256: Hex SHA-256 of the body
+            size: Size of the body in bytes
+            
+        Returns:
+            str: Path of the object
+        """
+        path = self.object_path(sha256)
+        if os.path.exists(path):
+            os.remove(staged)
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.chmod(staged, 0o444)
+            os.replace(staged, path)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?)",
+                             (url, sha256, size, time.time()))
+        return path
+    
+    def lookup(self, url: str) -> Optional[str]:
+        """
+        Path of the object stored for a URL.
+        
+        Returns:
+            str, or None if the URL was never stored
+        """
+        with self._lock:
+            row = self._db.execute("SELECT sha256 FROM urls WHERE url = ?", (url,)).fetchone()
+        return self.object_path(row[0]) if row else None
+    
+    def close(self) -> None:
+        """Close the index database."""
+        with self._lock:
+            self._db.close()
+
+
 async def save_file(filename: str, content: bytes) -> bool:
     """
     Save content to a file.
@@ -88,56 +675,397 @@ async def save_file(filename: str, content: bytes) -> bool:
             await f.write(content)
         return True
     except (IOError, PermissionError) as e:
-        logger.error(f"File write error for {filename}: {str(e)}")
+        logger.error("File write error for %s: %s", filename, e)
         return False
     except Exception as e:
-        logger.error(f"Unexpected error saving {filename}: {str(e)}")
+        logger.error("Unexpected error saving %s: %s", filename, e)
         return False
 
 
-async def download_files(urls: List[str]) -> Dict[str, int]:
+class Downloader:
+    """
+    Download engine owning one long-lived ClientSession.
+    
+    All requests share the session's TCPConnector, so keep-alive
+    connections (and their TLS sessions) and resolved addresses are reused
+    across URLs and retries instead of being rebuilt per request.
+    Use as an async context manager, or call ``open``/``close``.
+    
+    With a ``cache_path``, streaming downloads are recorded in a CacheIndex
+    and later runs send ``If-None-Match``/``If-Modified-Since``; a 304
+    counts as success without transferring or writing the body.
+    
+    With ``adaptive`` on, every host gets a HostState: URLs of a host whose
+    circuit is open fail fast, and ``run`` keeps each host within its AIMD
+    concurrency limit without tying up workers that could serve others.
+    
+    With a ``store_path``, bodies go to a ContentStore instead of
+    ``filename_for(url)``, and ``process`` always streams.
+    """
+    def __init__(self, limit: int = 100, limit_per_host: int = 10,
+                 keepalive_timeout: float = 30.0, ttl_dns_cache: Optional[int] = 300,
+                 chunk_size: int = CHUNK_SIZE, cache_path: Optional[str] = None,
+                 resume: bool = True, adaptive: bool = True, failure_threshold: int = 5,
+                 cooldown: float = 5.0, store_path: Optional[str] = None):
+        """
+        Initialize the engine; the session is created by ``open``.
+        
+        Args:
+            limit: Maximum number of open connections (0 for no limit)
+            limit_per_host: Maximum number of connections per host (0 for no limit)
+            keepalive_timeout: Seconds an idle connection is kept for reuse
+            ttl_dns_cache: Seconds resolved addresses are cached (None forever)
+            chunk_size: Bytes per chunk in streaming mode
+            cache_path: SQLite file of the conditional-request cache index
+            resume: Continue interrupted streaming downloads with Range requests
+            adaptive: Track per-host circuit breakers and concurrency limits
+            failure_threshold: Consecutive failures that open a host's circuit
+            cooldown: Seconds a host's circuit stays open before a probe
+            store_path: Root directory of a content-addressed store
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.chunk_size = chunk_size
+        self.cache_path = cache_path
+        self.resume = resume
+        self.adaptive = adaptive
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.store_path = store_path
+        self.cache: Optional[CacheIndex] = None
+        self.store: Optional[ContentStore] = None
+        self.hosts: Dict[str, HostState] = {}
+        self.not_modified = 0
+        self.short_circuited = 0
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def open(self) -> None:
+        """Create the session and its connector."""
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
+        if self.cache_path is not None:
+            self.cache = CacheIndex(self.cache_path)
+        if self.store_path is not None:
+            self.store = ContentStore(self.store_path)
+    
+    async def close(self) -> None:
+        """Close the session and every pooled connection."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+    
+    async def __aenter__(self) -> 'Downloader':
+        await self.open()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+    
+    async def fetch(self, url: str) -> Tuple[str, bytes, bool]:
+        """
+        Download a URL into memory, with retries.
+        
+        Returns:
+            Tuple containing the filename, content and success status
+        """
+        return await download_url(self.session, url, host=self.host_state(url))
+    
+    async def download(self, url: str, filename: Optional[str] = None) -> bool:
+        """
+        Stream a URL to disk, with retries. With a cache index the request
+        is conditional whenever the file saved last time is still in place.
+        
+        Args:
+            url: The URL to download
+            filename: Destination path (defaults to the content store, or
+                to ``filename_for(url)`` without one)
+            
+        Returns:
+            bool: True if the file was saved or is unchanged, False otherwise
+        """
+        storing = self.store is not None and filename is None
+        if storing:
+            path = self.store.staging_path(url)
+        else:
+            path = os.path.abspath(filename or filename_for(url))
+        headers = None
+        if self.cache is not None:
+            headers = self._conditional_headers(url, None if storing else path)
+        fetched = await stream_to_file(self.session, url, path, self.chunk_size, headers, self.resume,
+                                       host=self.host_state(url))
+        if fetched is None:
+            return False
+        
+        if storing and fetched.status == 200:
+            path = self.store.add(url, path, fetched.sha256, fetched.size)
+        if self.cache is not None:
+            if fetched.status == 304:
+                self.not_modified += 1
+                self.cache.touch(url)
+            else:
+                stat = os.stat(path)
+                self.cache.put(CacheEntry(url, path, fetched.etag, fetched.last_modified, fetched.sha256,
+                                          fetched.size, stat.st_mtime_ns, time.time()))
+        return True
+    
+    def host_state(self, url: str) -> Optional[HostState]:
+        """HostState of a URL's host, created on first use (None if not adaptive)."""
+        host = host_of(url) if self.adaptive else None
+        if host is None:
+            return None
+        state = self.hosts.get(host)
+        if state is None:
+            # Without a per-host connection cap, the AIMD limit is the only one
+            state = self.hosts[host] = HostState(
+                host, max_limit=self.limit_per_host or self.limit or 100,
+                failure_threshold=self.failure_threshold, cooldown=self.cooldown)
+        return state
+    
+    def _conditional_headers(self, url: str, path: Optional[str]) -> Optional[Dict[str, str]]:
+        """
+        Validators of the cached copy of a URL, if that copy is still intact
+        (and saved at ``path``, unless None).
+        """
+        entry = self.cache.get(url)
+        if entry is None or path not in (None, entry.path):
+            return None
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return None
+        if stat.st_size != entry.size or stat.st_mtime_ns != entry.mtime_ns:
+            return None
+        
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers or None
+    
+    async def process(self, url: str, stream: bool = False) -> bool:
+        """
+        Download one URL and save it, logging the outcome.
+        
+        When adaptive, the request waits for a slot within its host's
+        concurrency limit (only the probe gets through while half-open) and
+        fails fast while the host's circuit is open.
+        
+        Args:
+            url: The URL to download
+            stream: Write the body to disk while downloading
+            
+        Returns:
+            bool: True if the file was saved, False otherwise
+        """
+        if not url.startswith(('http://', 'https://')):
+            logger.warning("Invalid URL format: %s. Skipping.", url)
+            return False
+        state = self.host_state(url)
+        if state is not None and not await state.acquire():
+            self.short_circuited += 1
+            logger.warning("Circuit for %s is open. Skipping %s", state.host, url)
+            return False
+        try:
+            return await self._save(url, stream)
+        finally:
+            if state is not None:
+                state.release()
+    
+    async def _save(self, url: str, stream: bool) -> bool:
+        """Download and save a URL for ``process``, without the host checks."""
+        if stream or self.store is not None:
+            if not await self.download(url):
+                return False
+            filename = url if self.store is not None else filename_for(url)
+        else:
+            filename, content, success = await self.fetch(url)
+            if not (success and content):
+                return False
+            if not await save_file(filename, content):
+                logger.error("Failed to save %s", filename)
+                return False
+        logger.info("Successfully saved %s", filename)
+        return True
+    
+    async def download_files(self, urls: List[str], stream: bool = False) -> Dict[str, int]:
+        """
+        Download multiple files from URLs concurrently; see ``download_files``.
+        
+        Returns:
+            Dict with counts of successful and failed downloads
+        """
+        results = {'success': 0, 'failed': 0}
+        for saved in await asyncio.gather(*(self.process(url, stream) for url in urls)):
+            results['success' if saved else 'failed'] += 1
+        
+        logger.info("Download summary: %s", results)
+        return results
+    
+    async def run(self, urls: Union[Iterable[str], AsyncIterable[str]], workers: int = 32,
+                  queue_size: Optional[int] = None, stream: bool = True) -> Dict[str, int]:
+        """
+        Download a stream of URLs with a fixed number of workers.
+        
+        URLs are pulled lazily (e.g. line by line from a file) into a
+        bounded queue feeding ``workers`` coroutines, so the number of
+        tasks and the memory in use do not depend on how many URLs there
+        are. Surrounding whitespace is stripped and blank lines skipped.
+        
+        When adaptive, a worker that picks up a URL whose host is at its
+        concurrency limit sets it aside and moves on; set-aside URLs are
+        taken up again first as soon as their host has a free slot (or
+        fail fast once its circuit opens). Up to 16 times ``queue_size``
+        URLs are set aside before the workers stop pulling new ones, which
+        is enough to keep healthy hosts busy while a dead one trips its
+        circuit.
+        
+        Args:
+            urls: Iterable or async iterable of URLs
+            workers: Number of concurrent downloads
+            queue_size: Capacity of the queue between the URL source and the
+                workers (defaults to twice the number of workers)
+            stream: Write bodies to disk while downloading
+            
+        Returns:
+            Dict with counts of successful and failed downloads
+            
+        Raises:
+            Exception: Whatever reading ``urls`` or saving a download
+                raised; the remaining downloads are cancelled
+        """
+        results = {'success': 0, 'failed': 0}
+        pending: asyncio.Queue = asyncio.Queue(maxsize=queue_size or 2 * workers)
+        deferred: Dict[str, Deque[str]] = {}  # host -> URLs waiting for a slot
+        max_deferred = 16 * (queue_size or 2 * workers)
+        slot_freed = asyncio.Event()
+        
+        def next_deferred() -> Optional[str]:
+            for host, waiting in deferred.items():
+                state = self.hosts[host]
+                if state.is_open() or state.has_capacity():
+                    url = waiting.popleft()
+                    if not waiting:
+                        del deferred[host]
+                    return url
+            return None
+        
+        async def handle(url: str) -> None:
+            state = self.host_state(url) if url.startswith(('http://', 'https://')) else None
+            if state is not None and not state.is_open() and not state.has_capacity():
+                deferred.setdefault(state.host, deque()).append(url)
+                return
+            # process() takes the free slot before its first await
+            try:
+                saved = await self.process(url, stream)
+            finally:
+                if state is not None:
+                    slot_freed.set()
+            results['success' if saved else 'failed'] += 1
+        
+        async def work() -> None:
+            exhausted = False
+            while True:
+                url = next_deferred()
+                if url is None:
+                    if not exhausted and sum(map(len, deferred.values())) < max_deferred:
+                        url = await pending.get()
+                        if url is None:
+                            exhausted = True
+                            continue
+                    elif deferred:
+                        slot_freed.clear()
+                        await slot_freed.wait()
+                        continue
+                    else:
+                        return
+                await handle(url)
+        
+        async def produce() -> None:
+            if isinstance(urls, AsyncIterable):
+                async for url in urls:
+                    if url.strip():
+                        await pending.put(url.strip())
+            else:
+                for url in urls:
+                    if url.strip():
+                        await pending.put(url.strip())
+            for _ in range(workers):
+                await pending.put(None)
+        
+        # The producer runs alongside the workers, so that an error in any
+        # of them ends the run instead of leaving the producer blocked on a
+        # full queue nobody reads
+        tasks = [asyncio.create_task(produce())] + [asyncio.create_task(work()) for _ in range(workers)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        logger.info("Download summary: %s", results)
+        return results
+
+
+async def download_files(urls: List[str], stream: bool = False,
+                         chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
     """
     Download multiple files from URLs concurrently.
     
+    By default every body is read into memory and the files are written
+    once all downloads are done. With ``stream=True`` each response is
+    written to disk chunk by chunk as it arrives, so memory stays around
+    ``len(urls) * chunk_size`` however large the files are.
+    
     Args:
         urls: List of URLs to download
+        stream: Write bodies to disk while downloading
+        chunk_size: Bytes per chunk in streaming mode
         
     Returns:
         Dict with counts of successful and failed downloads
     """
-    results = {'success': 0, 'failed': 0}
+    async with Downloader(chunk_size=chunk_size) as downloader:
+        return await downloader.download_files(urls, stream)
+
+
+async def download_pipeline(urls: Union[Iterable[str], AsyncIterable[str]], workers: int = 32,
+                            queue_size: Optional[int] = None, stream: bool = True,
+                            **options) -> Dict[str, int]:
+    """
+    Download any number of URLs with bounded concurrency and memory.
     
-    # Use a connection pooling session
-    async with aiohttp.ClientSession() as session:
-        download_tasks = []
-        
-        # Create download tasks
-        for url in urls:
-            if not url.startswith(('http://', 'https://')):
-                logger.warning(f"Invalid URL format: {url}. Skipping.")
-                results['failed'] += 1
-                continue
-                
-            download_tasks.append(download_url(session, url))
+    Args:
+        urls: Iterable or async iterable of URLs, e.g. an open file
+        workers: Number of concurrent downloads
+        queue_size: Capacity of the queue feeding the workers
+        stream: Write bodies to disk while downloading
+        **options: Downloader settings (connection limits, chunk size,
+            cache index, content store)
         
-        # Wait for all downloads to complete
-        if download_tasks:
-            downloads = await asyncio.gather(*download_tasks)
-            
-            # Process downloads and save to files
-            for filename, content, success in downloads:
-                if success and content:
-                    if await save_file(filename, content):
-                        logger.info(f"Successfully saved {filename}")
-                        results['success'] += 1
-                    else:
-                        logger.error(f"Failed to save {filename}")
-                        results['failed'] += 1
-                else:
-                    results['failed'] += 1
-    
-    logger.info(f"Download summary: {results}")
-    return results
+    Returns:
+        Dict with counts of successful and failed downloads
+    """
+    async with Downloader(**options) as downloader:
+        return await downloader.run(urls, workers, queue_size, stream)
 
 
 async def main():
@@ -153,4 +1081,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Write log records from a background thread, off the event loop
+    start_log_pipeline()
     asyncio.run(main())